@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Hot New Releases Robot Library
+Bulk keywords that extract products from the open SeleniumLibrary browser in one call each
+"""
+
+from robot.libraries.BuiltIn import BuiltIn
+from bulk_extractor import extract_products_in_browser, get_category_name_in_browser
+from page_health import probe_page_health, print_page_health
+from page_snapshot import page_snapshot, grid_capture_stats
+from offline_extractor import node_text
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from pageobjects.locators import HotNewRelease as locators
+
+
+class HotNewReleasesLibrary:
+    """Robot Framework keywords for Hot New Releases extraction"""
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    @property
+    def driver(self):
+        """WebDriver of the browser opened with SeleniumLibrary's Open Browser"""
+        return BuiltIn().get_library_instance('SeleniumLibrary').driver
+
+    def extract_products_from_current_page(self, max_products=5):
+        """Extract up to max_products products from the current page in one browser call
+
+        Products without a meaningful title (10 characters or less) are
+        skipped. Returns a list of dictionaries with ranking, title, price,
+        rating, rank, link and extracted_at.
+        """
+        products = []
+        for product in extract_products_in_browser(self.driver, int(max_products)):
+            if product['title'] == "No Title Available" or len(product['title']) <= 10:
+                print(f"Skipping product {product['ranking']} - no meaningful title")
+                continue
+            product['ranking'] = len(products) + 1
+            products.append(product)
+
+        print(f"Successfully extracted {len(products)} products")
+        return products
+
+    def get_dynamic_category_name(self):
+        """Get the Hot New Releases category heading of the current page"""
+        category_name = get_category_name_in_browser(self.driver, [
+            locators.hot_new_releases_title,
+            "//h2[contains(text(), 'Hot New Releases')]"
+        ])
+        category_name = category_name or "Unknown Category"
+        print(f"Found category: {category_name}")
+        return category_name
+
+    def wait_for_product_grid(self, timeout=15):
+        """Wait until the product grid is rendered and the page has stopped changing"""
+        return wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH, timeout=float(timeout))
+
+    def get_page_health(self):
+        """Return element count, text/html length, title, url and marker presence of the current page"""
+        health = probe_page_health(self.driver)
+        print_page_health(health)
+        return health
+
+    def get_page_snapshot_summary(self, *xpaths):
+        """Return title, url, source length, New Releases markers, heading texts and counts for xpaths from one page snapshot
+
+        The page source is read once and shared with later snapshot keywords
+        until the page changes, instead of one browser round trip per lookup.
+        """
+        snapshot = page_snapshot(self.driver)
+        if snapshot is None:
+            raise RuntimeError("Could not read the current page")
+        summary = {
+            'title': snapshot.title,
+            'url': snapshot.url,
+            'source_length': len(snapshot.source),
+            'markers': {marker: snapshot.contains(marker) for marker in ("Hot New Releases", "New Releases")},
+            'headings': {tag: [node_text(node) for node in snapshot.xpath(f"//{tag}")] for tag in ('h1', 'h2', 'h3')},
+            'counts': {xpath: snapshot.count(xpath) for xpath in xpaths}
+        }
+        print(f"Page snapshot: '{summary['title']}' {summary['url']} ({summary['source_length']} chars)")
+        return summary
+
+    def save_product_grid_snapshot(self, filename):
+        """Save only the category headings and product grid of the current page to filename
+
+        Returns the full page size, the captured size and the bytes saved.
+        Falls back to the whole page when no product grid is found.
+        """
+        snapshot = page_snapshot(self.driver, scope='grid')
+        if snapshot is None:
+            raise RuntimeError("Could not read the current page")
+        snapshot.save(filename)
+        return {
+            'scope': snapshot.scope,
+            'full_bytes': snapshot.full_bytes,
+            'captured_bytes': snapshot.captured_bytes,
+            'bytes_saved': snapshot.bytes_saved
+        }
+
+    def get_grid_capture_stats(self):
+        """Return the per-page and total bytes saved by product grid captures in this run"""
+        stats = grid_capture_stats()
+        print(f"Grid captures: {len(stats['pages'])} pages, {stats['bytes_saved']} bytes saved "
+              f"({stats['ratio']}x smaller)")
+        return stats
@@ -5,40 +5,33 @@ Uses multiple techniques to bypass anti-bot detection
 """
 
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import json
 import csv
 from datetime import datetime
 import random
 import re
-import requests
 from bs4 import BeautifulSoup
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
+from strategy_racer import NavigationRace, SITE_URL, navigation_slot, begin_navigation, menu_navigation_steps
+from async_fetcher import AsyncPageFetcher
+from response_cache import ResponseCache
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import CSV_FIELDS
 
 class AdvancedAmazonExtractor:
     def __init__(self):
         self.driver = None
-        self.session = requests.Session()
         self.products = []
         
-    def setup_requests_session(self):
-        """Setup requests session with proper headers"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        self.session.headers.update(headers)
-        
     def setup_driver_stealth(self):
         """Setup Chrome driver with maximum stealth"""
         print("🔧 Setting up stealth Chrome driver...")
@@ -87,7 +80,7 @@ class AdvancedAmazonExtractor:
         }
         chrome_options.add_experimental_option("prefs", prefs)
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         
         # Execute stealth scripts
@@ -97,53 +90,42 @@ class AdvancedAmazonExtractor:
         
         print("✅ Stealth Chrome driver setup complete")
         
-    def human_like_delay(self, min_delay=1, max_delay=3):
-        """Add human-like delays"""
-        delay = random.uniform(min_delay, max_delay)
-        time.sleep(delay)
-        
     def login_to_amazon(self, email, password):
         """Login to Amazon with human-like behavior"""
         try:
             print("🔐 Logging into Amazon...")
             
             # Go to Amazon homepage first
-            self.driver.get("https://www.amazon.in/")
-            self.human_like_delay(2, 4)
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on sign in
             sign_in_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[text()='Hello, sign in']"))
             )
-            sign_in_element.click()
-            self.human_like_delay(1, 2)
+            scheduled_click(self.driver, sign_in_element)
             
             # Enter email
             email_field = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "ap_email"))
             )
             email_field.clear()
-            for char in email:
-                email_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))
+            email_field.send_keys(email)
             
             # Click continue
             continue_btn = self.driver.find_element(By.ID, "continue")
-            continue_btn.click()
-            self.human_like_delay(1, 2)
+            scheduled_click(self.driver, continue_btn)
             
             # Enter password
             password_field = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "ap_password"))
             )
             password_field.clear()
-            for char in password:
-                password_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))
+            password_field.send_keys(password)
             
             # Click sign in
             signin_btn = self.driver.find_element(By.ID, "signInSubmit")
-            signin_btn.click()
+            scheduled_click(self.driver, signin_btn)
             
             # Wait for login to complete
             WebDriverWait(self.driver, 15).until(
@@ -157,129 +139,75 @@ class AdvancedAmazonExtractor:
             return False
     
     def navigate_with_multiple_strategies(self):
-        """Try multiple navigation strategies"""
-        strategies = [
-            self.strategy_direct_navigation,
-            self.strategy_menu_navigation,
-            self.strategy_search_navigation,
-            self.strategy_requests_fallback
-        ]
+        """Race the navigation strategies and keep the first that reaches the New Releases page"""
+        race = NavigationRace(
+            self.driver,
+            accept=lambda health: health['markers']['Hot New Releases'] and health['html_length'] > 10000
+        )
+        race.add_url("Direct navigation", "https://www.amazon.in/gp/new-releases/")
+        race.add_steps("Menu navigation", menu_navigation_steps)
+        race.add_steps("Search navigation", self.search_navigation_steps)
         
-        for i, strategy in enumerate(strategies, 1):
-            print(f"🔄 Trying strategy {i}...")
-            try:
-                if strategy():
-                    print(f"✅ Strategy {i} successful!")
-                    return True
-            except Exception as e:
-                print(f"❌ Strategy {i} failed: {e}")
-                continue
+        # Copy the browser's cookies now - the worker thread must not use the driver
+        fetcher = AsyncPageFetcher.from_driver(self.driver, cache=ResponseCache())
+        race.add_worker("Requests fallback", lambda: self.strategy_requests_fallback(fetcher))
         
-        print("❌ All navigation strategies failed")
-        return False
-    
-    def strategy_direct_navigation(self):
-        """Strategy 1: Direct navigation to new releases"""
-        try:
-            print("🌐 Direct navigation to new releases...")
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            self.human_like_delay(5, 8)
-            
-            # Check if page loaded
-            page_source = self.driver.page_source
-            if "Hot New Releases" in page_source and len(page_source) > 10000:
-                print("✅ Direct navigation successful")
-                return True
-            else:
-                print("⚠️ Direct navigation - page too short or no content")
-                return False
-        except Exception as e:
-            print(f"❌ Direct navigation failed: {e}")
-            return False
-    
-    def strategy_menu_navigation(self):
-        """Strategy 2: Navigate through menu"""
-        try:
-            print("🍔 Menu navigation...")
-            self.driver.get("https://www.amazon.in/")
-            self.human_like_delay(2, 3)
-            
-            # Click on All menu
-            all_menu = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//span[@class='hm-icon-label'][1]"))
-            )
-            all_menu.click()
-            self.human_like_delay(2, 3)
-            
-            # Click on New Releases
-            new_releases = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'New Releases')]"))
-            )
-            new_releases.click()
-            self.human_like_delay(5, 8)
-            
-            # Check if page loaded
-            page_source = self.driver.page_source
-            if "Hot New Releases" in page_source and len(page_source) > 10000:
-                print("✅ Menu navigation successful")
-                return True
-            else:
-                print("⚠️ Menu navigation - page too short or no content")
-                return False
-        except Exception as e:
-            print(f"❌ Menu navigation failed: {e}")
+        print("🔄 Racing navigation strategies...")
+        if not race.run():
+            print("❌ All navigation strategies failed")
             return False
+        
+        print(f"✅ {race.winner} successful!")
+        if race.winner == "Requests fallback":
+            self.products = race.result
+        return True
     
-    def strategy_search_navigation(self):
-        """Strategy 3: Search for new releases"""
-        try:
-            print("🔍 Search navigation...")
-            self.driver.get("https://www.amazon.in/")
-            self.human_like_delay(2, 3)
-            
-            # Search for "new releases"
-            search_box = self.driver.find_element(By.ID, "twotabsearchtextbox")
-            search_box.clear()
-            search_box.send_keys("new releases")
-            search_box.submit()
-            self.human_like_delay(3, 5)
-            
-            # Try to find new releases link
-            new_releases_link = self.driver.find_element(By.XPATH, "//a[contains(@href, '/gp/new-releases/')]")
-            new_releases_link.click()
-            self.human_like_delay(5, 8)
-            
-            # Check if page loaded
-            page_source = self.driver.page_source
-            if "Hot New Releases" in page_source and len(page_source) > 10000:
-                print("✅ Search navigation successful")
-                return True
-            else:
-                print("⚠️ Search navigation - page too short or no content")
-                return False
-        except Exception as e:
-            print(f"❌ Search navigation failed: {e}")
-            return False
+    def search_navigation_steps(self, driver):
+        """Search for new releases, as race steps"""
+        yield from navigation_slot(SITE_URL)
+        begin_navigation(driver, SITE_URL)
+        while not driver.find_elements(By.ID, "twotabsearchtextbox"):
+            yield
+        
+        # Search for "new releases"
+        search_box = driver.find_element(By.ID, "twotabsearchtextbox")
+        search_box.clear()
+        search_box.send_keys("new releases")
+        home_url = driver.current_url
+        yield from navigation_slot(home_url)
+        search_box.submit()
+        
+        # Follow the new releases link on the results page
+        while driver.current_url == home_url:
+            yield
+        links = driver.find_elements(By.XPATH, "//a[contains(@href, '/gp/new-releases/')]")
+        while not links:
+            yield
+            links = driver.find_elements(By.XPATH, "//a[contains(@href, '/gp/new-releases/')]")
+        href = links[0].get_attribute('href')
+        yield from navigation_slot(href)
+        begin_navigation(driver, href)
     
-    def strategy_requests_fallback(self):
-        """Strategy 4: Use requests as fallback"""
+    def strategy_requests_fallback(self, fetcher):
+        """Fetch the candidate URLs over HTTP and parse the first good page - a race worker, so no driver calls"""
         try:
             print("🌐 Requests fallback...")
-            self.setup_requests_session()
-            
-            # Get the page with requests
-            response = self.session.get("https://www.amazon.in/gp/new-releases/")
-            if response.status_code == 200 and "Hot New Releases" in response.text:
-                print("✅ Requests fallback successful")
+            url, body = fetcher.fetch_first([
+                "https://www.amazon.in/gp/new-releases/",
+                "https://www.amazon.in/gp/new-releases/?ref_=nav_em_cs_newreleases_0_1_1_3",
+                "https://www.amazon.in/s?k=new+releases&ref=sr_pg_1"
+            ], lambda html: "Hot New Releases" in html)
+            if body:
+                print(f"✅ Requests fallback fetched: {url}")
                 # Parse with BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(body, 'html.parser')
                 return self.extract_products_from_soup(soup)
             else:
                 print("⚠️ Requests fallback - no content")
-                return False
+                return []
         except Exception as e:
             print(f"❌ Requests fallback failed: {e}")
-            return False
+            return []
     
     def extract_products_from_soup(self, soup):
         """Extract products from BeautifulSoup object"""
@@ -290,10 +218,19 @@ class AdvancedAmazonExtractor:
             # Find product links
             product_links = soup.find_all('a', href=re.compile(r'/dp/'))
             
-            for i, link in enumerate(product_links[:5]):
+            # Image and title links of one product share its ASIN - keep the one with text
+            seen_asins = set()
+            for i, link in enumerate(product_links):
+                if len(products) >= 5:
+                    break
+                asin = extract_asin(link.get('href'))
+                if asin and (asin in seen_asins or not link.get_text(strip=True)):
+                    continue
+                seen_asins.add(asin)
                 try:
                     product_data = {
-                        'ranking': i + 1,
+                        'ranking': len(products) + 1,
+                        'asin': asin,
                         'title': link.get_text(strip=True)[:100] if link.get_text(strip=True) else 'No Title',
                         'price': 'Price Not Available',
                         'rating': 'No Rating Available',
@@ -315,15 +252,11 @@ class AdvancedAmazonExtractor:
                     print(f"❌ Error extracting product {i+1}: {e}")
                     continue
             
-            if products:
-                self.products = products
-                return True
-            else:
-                return False
+            return products
                 
         except Exception as e:
             print(f"❌ Error extracting from soup: {e}")
-            return False
+            return []
     
     def extract_products_selenium(self):
         """Extract products using Selenium"""
@@ -331,12 +264,12 @@ class AdvancedAmazonExtractor:
             print("🛍️ Extracting products with Selenium...")
             products = []
             
-            # Wait for page to load
-            self.human_like_delay(3, 5)
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Scroll to load content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            self.human_like_delay(2, 3)
+            wait_for_page_ready(self.driver)
             
             # Try multiple selectors
             selectors = [
@@ -362,10 +295,16 @@ class AdvancedAmazonExtractor:
                 return []
             
             # Extract data from elements
+            seen_asins = set()
             for i, element in enumerate(product_elements[:5]):
                 try:
+                    asin = extract_asin(get_product_link(element))
+                    if asin and asin in seen_asins:
+                        print(f"Skipping product {i+1} - duplicate of {asin}")
+                        continue
                     product_data = {
-                        'ranking': i + 1,
+                        'ranking': len(products) + 1,
+                        'asin': asin,
                         'title': 'No Title Available',
                         'price': 'Price Not Available',
                         'rating': 'No Rating Available',
@@ -397,6 +336,7 @@ class AdvancedAmazonExtractor:
                         product_data['rating'] = rating_match.group()
                     
                     if product_data['title'] != 'No Title Available':
+                        seen_asins.add(asin)
                         products.append(product_data)
                         print(f"✅ Extracted product {i+1}: {product_data['title'][:50]}...")
                     
@@ -461,8 +401,7 @@ class AdvancedAmazonExtractor:
             # Save CSV
             csv_filename = f"hot_new_releases_{safe_category}_{timestamp}.csv"
             with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS, extrasaction='ignore')
                 writer.writeheader()
                 
                 for product in products:
@@ -488,7 +427,7 @@ class AdvancedAmazonExtractor:
             self.setup_driver_stealth()
             
             # Login
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("❌ Cannot proceed without login")
                 return False
             
@@ -513,6 +452,9 @@ class AdvancedAmazonExtractor:
             # Save to files
             json_file, csv_file = self.save_to_files(products, category_name)
             
+            # Append this run to the product history database
+            record_products(products, category_name)
+            
             # Display results
             print(f"\n🎉 EXTRACTION COMPLETED SUCCESSFULLY!")
             print(f"📊 Category: {category_name}")
@@ -5,19 +5,25 @@ Bypasses anti-bot detection and extracts product data
 """
 
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import json
-import csv
 from datetime import datetime
 import random
 import re
+from dom_candidates import find_candidate_containers
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
+from page_health import probe_page_health
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import ProductStreamWriter
+from excel_writer import write_products_excel
 
 class AmazonHotReleasesExtractor:
     def __init__(self):
@@ -60,7 +66,7 @@ class AmazonHotReleasesExtractor:
         # Window size
         chrome_options.add_argument("--window-size=1920,1080")
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         
         # Execute script to remove webdriver property
@@ -72,7 +78,7 @@ class AmazonHotReleasesExtractor:
         """Login to Amazon with provided credentials"""
         try:
             print("🔐 Logging into Amazon...")
-            self.driver.get("https://www.amazon.in/ap/signin")
+            scheduled_get(self.driver, "https://www.amazon.in/ap/signin")
             
             # Wait for email field
             email_field = WebDriverWait(self.driver, 10).until(
@@ -83,7 +89,7 @@ class AmazonHotReleasesExtractor:
             
             # Click continue
             continue_btn = self.driver.find_element(By.ID, "continue")
-            continue_btn.click()
+            scheduled_click(self.driver, continue_btn)
             
             # Wait for password field
             password_field = WebDriverWait(self.driver, 10).until(
@@ -94,7 +100,7 @@ class AmazonHotReleasesExtractor:
             
             # Click sign in
             signin_btn = self.driver.find_element(By.ID, "signInSubmit")
-            signin_btn.click()
+            scheduled_click(self.driver, signin_btn)
             
             # Wait for login to complete
             WebDriverWait(self.driver, 15).until(
@@ -113,8 +119,8 @@ class AmazonHotReleasesExtractor:
             print("🌐 Navigating to Hot New Releases page...")
             
             # Try direct navigation first
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            time.sleep(5)
+            scheduled_get(self.driver, "https://www.amazon.in/gp/new-releases/")
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Check if page loaded properly
             page_title = self.driver.title
@@ -127,11 +133,11 @@ class AmazonHotReleasesExtractor:
             
             # Scroll to load content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(3)
+            wait_for_page_ready(self.driver)
             
             # Check for Hot New Releases content
-            page_source = self.driver.page_source
-            if "Hot New Releases" in page_source:
+            health = probe_page_health(self.driver)
+            if health['markers']['Hot New Releases']:
                 print("✅ Successfully navigated to Hot New Releases page")
                 return True
             else:
@@ -172,23 +178,24 @@ class AmazonHotReleasesExtractor:
             print(f"❌ Error extracting category: {e}")
             return "Hot New Releases"
     
-    def extract_products(self):
-        """Extract top 5 products from the page"""
+    def extract_products(self, on_product=None):
+        """Extract top 5 products from the page, passing each one to on_product as soon as it is kept"""
         try:
             print("🛍️ Extracting products...")
             products = []
             
-            # Wait for page to fully load
-            time.sleep(5)
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Try multiple strategies to find products
             product_containers = []
+            container_texts = []
             
             # Strategy 1: Look for product links
             try:
                 product_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/dp/')]")
                 print(f"Found {len(product_links)} product links")
-                product_containers = product_links[:10]  # Take first 10
+                product_containers = product_links
             except:
                 print("No product links found")
             
@@ -197,34 +204,32 @@ class AmazonHotReleasesExtractor:
                 try:
                     containers = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'zg-item')]")
                     print(f"Found {len(containers)} zg-item containers")
-                    product_containers = containers[:10]
+                    product_containers = containers
                 except:
                     print("No zg-item containers found")
             
-            # Strategy 3: Look for any divs that might contain products
+            # Strategy 3: Best-scoring product-like divs on the whole page, scored inside the browser
             if not product_containers:
+                candidates = find_candidate_containers(self.driver, top_n=10)
+                product_containers = [candidate['element'] for candidate in candidates]
+                container_texts = [candidate['text'] for candidate in candidates]
+                print(f"Found {len(product_containers)} potential product containers")
+            
+            # Extract product data - the fallback strategies can hit the same product twice
+            seen_asins = set()
+            for i, container in enumerate(product_containers):
+                if len(products) >= 5:
+                    break
                 try:
-                    all_divs = self.driver.find_elements(By.XPATH, "//div")
-                    # Filter divs that might contain product info
-                    for div in all_divs[:50]:  # Check first 50 divs
-                        try:
-                            text = div.text.strip()
-                            if len(text) > 20 and len(text) < 500 and ('₹' in text or 'out of' in text):
-                                product_containers.append(div)
-                                if len(product_containers) >= 10:
-                                    break
-                        except:
-                            continue
-                    print(f"Found {len(product_containers)} potential product containers")
-                except:
-                    print("No product containers found")
-            
-            # Extract product data
-            for i, container in enumerate(product_containers[:5]):
-                try:
-                    product_data = self.extract_product_data(container, i + 1)
-                    if product_data and product_data.get('title') != 'No Title Available':
+                    product_data = self.extract_product_data(container, i + 1, container_texts[i] if container_texts else None)
+                    if product_data and product_data['asin'] and product_data['asin'] in seen_asins:
+                        print(f"⚠️ Skipped product {i+1} - duplicate of {product_data['asin']}")
+                    elif product_data and product_data.get('title') != 'No Title Available':
+                        seen_asins.add(product_data['asin'])
+                        product_data['ranking'] = len(products) + 1
                         products.append(product_data)
+                        if on_product:
+                            on_product(product_data)
                         print(f"✅ Extracted product {i+1}: {product_data['title'][:50]}...")
                     else:
                         print(f"⚠️ Skipped product {i+1} - insufficient data")
@@ -239,11 +244,12 @@ class AmazonHotReleasesExtractor:
             print(f"❌ Error extracting products: {e}")
             return []
     
-    def extract_product_data(self, container, rank):
-        """Extract data from a single product container"""
+    def extract_product_data(self, container, rank, text=None):
+        """Extract data from a single product container (text, when already known, saves reading it again)"""
         try:
             product_data = {
                 'ranking': rank,
+                'asin': extract_asin(get_product_link(container)),
                 'title': 'No Title Available',
                 'price': 'Price Not Available',
                 'rating': 'No Rating Available',
@@ -251,7 +257,7 @@ class AmazonHotReleasesExtractor:
             }
             
             # Get all text from container
-            container_text = container.text.strip()
+            container_text = (container.text if text is None else text).strip()
             
             # Extract title (longest meaningful text)
             lines = container_text.split('\n')
@@ -307,29 +313,6 @@ class AmazonHotReleasesExtractor:
             print(f"❌ Error saving JSON: {e}")
             return None
     
-    def save_to_csv(self, products, category_name):
-        """Save products to CSV file"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"hot_new_releases_{category_name}_{timestamp}.csv"
-            filename = re.sub(r'[^\w\-_.]', '_', filename)
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for product in products:
-                    product['category'] = category_name
-                    writer.writerow(product)
-            
-            print(f"💾 CSV file saved: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"❌ Error saving CSV: {e}")
-            return None
-    
     def run_extraction(self, email, password):
         """Main extraction process"""
         try:
@@ -339,7 +322,7 @@ class AmazonHotReleasesExtractor:
             self.setup_driver()
             
             # Login
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("❌ Cannot proceed without login")
                 return False
             
@@ -351,8 +334,9 @@ class AmazonHotReleasesExtractor:
             # Extract category name
             category_name = self.extract_category_name()
             
-            # Extract products
-            products = self.extract_products()
+            # Extract products, streaming each one to disk as it is found
+            with ProductStreamWriter(category_name) as stream:
+                products = self.extract_products(on_product=stream.write)
             
             if not products:
                 print("❌ No products extracted")
@@ -360,7 +344,11 @@ class AmazonHotReleasesExtractor:
             
             # Save to files
             json_file = self.save_to_json(products, category_name)
-            csv_file = self.save_to_csv(products, category_name)
+            csv_file = stream.csv_filename
+            excel_file = write_products_excel(stream.basename + '.xlsx', products, category_name)
+            
+            # Append this run to the product history database
+            record_products(products, category_name)
             
             # Display results
             print(f"\n🎉 EXTRACTION COMPLETED SUCCESSFULLY!")
@@ -368,6 +356,8 @@ class AmazonHotReleasesExtractor:
             print(f"🛍️ Products extracted: {len(products)}")
             print(f"📄 JSON file: {json_file}")
             print(f"📊 CSV file: {csv_file}")
+            print(f"📄 JSON Lines file: {stream.jsonl_filename}")
+            print(f"📊 Excel file: {excel_file}")
             
             print(f"\n📋 EXTRACTED PRODUCTS:")
             for i, product in enumerate(products, 1):
@@ -4,18 +4,23 @@ Simple Amazon Hot New Releases Extractor
 Uses a different approach to bypass blank page issues
 """
 
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 import json
 import csv
 import re
 from datetime import datetime
-import time
-import random
+from http_fetcher import create_pooled_session, ACCEPT_ENCODING
+from async_fetcher import AsyncPageFetcher
+from response_cache import ResponseCache
+from product_history import record_products
+from product_fields import extract_asin
+from stream_writer import CSV_FIELDS
 
 class SimpleAmazonExtractor:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = create_pooled_session()
+        self.cache = ResponseCache()
         self.products = []
         
     def setup_session(self):
@@ -24,7 +29,7 @@ class SimpleAmazonExtractor:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Cache-Control': 'max-age=0',
@@ -36,31 +41,6 @@ class SimpleAmazonExtractor:
         }
         self.session.headers.update(headers)
         
-    def get_page_content(self, url):
-        """Get page content with retry logic"""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                print(f"🌐 Fetching page (attempt {attempt + 1})...")
-                
-                # Add random delay
-                time.sleep(random.uniform(1, 3))
-                
-                response = self.session.get(url, timeout=30)
-                
-                if response.status_code == 200:
-                    print(f"✅ Page fetched successfully (length: {len(response.text)})")
-                    return response.text
-                else:
-                    print(f"⚠️ HTTP {response.status_code}")
-                    
-            except Exception as e:
-                print(f"❌ Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(2, 5))
-                    
-        return None
-    
     def extract_products_from_html(self, html_content):
         """Extract products from HTML content"""
         try:
@@ -94,11 +74,18 @@ class SimpleAmazonExtractor:
             product_links = soup.find_all('a', href=re.compile(r'/dp/'))
             print(f"Found {len(product_links)} product links")
             
-            # Extract product data
-            for i, link in enumerate(product_links[:5]):
+            # Extract product data - image and title links of one product share its ASIN
+            seen_asins = set()
+            for i, link in enumerate(product_links):
+                if len(products) >= 5:
+                    break
+                asin = extract_asin(link.get('href'))
+                if asin and asin in seen_asins:
+                    continue
                 try:
                     product_data = {
-                        'ranking': i + 1,
+                        'ranking': len(products) + 1,
+                        'asin': asin,
                         'title': 'No Title Available',
                         'price': 'Price Not Available',
                         'rating': 'No Rating Available',
@@ -127,6 +114,7 @@ class SimpleAmazonExtractor:
                                 product_data['rating'] = rating_match.group()
                     
                     if product_data['title'] != 'No Title Available':
+                        seen_asins.add(asin)
                         products.append(product_data)
                         print(f"✅ Extracted product {i+1}: {product_data['title'][:50]}...")
                     
@@ -161,8 +149,7 @@ class SimpleAmazonExtractor:
             # Save CSV
             csv_filename = f"hot_new_releases_{safe_category}_{timestamp}.csv"
             with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS, extrasaction='ignore')
                 writer.writeheader()
                 
                 for product in products:
@@ -179,6 +166,20 @@ class SimpleAmazonExtractor:
             print(f"❌ Error saving files: {e}")
             return None, None
     
+    async def extract_first_successful(self, fetcher, urls):
+        """Extract products from the first page to arrive that has any - the other fetches are cancelled"""
+        async for url, status, body in fetcher.stream(urls):
+            html_content = body.decode('utf-8', errors='replace') if body else None
+            if html_content and "Hot New Releases" in html_content:
+                products, category_name = self.extract_products_from_html(html_content)
+                if products:
+                    print(f"✅ {url} successful!")
+                    return products, category_name
+                print(f"⚠️ {url} - No products extracted")
+            else:
+                print(f"❌ {url} - No content or blank page")
+        return [], None
+    
     def run_extraction(self):
         """Main extraction process"""
         try:
@@ -194,39 +195,33 @@ class SimpleAmazonExtractor:
                 "https://www.amazon.in/s?k=new+releases&ref=sr_pg_1"
             ]
             
-            for i, url in enumerate(urls, 1):
-                print(f"\n🔄 Trying URL {i}: {url}")
+            # Fetch all URLs concurrently, fresh pages from the response cache, and extract from
+            # the first page that has products
+            fetcher = AsyncPageFetcher(cookies=self.session.cookies.get_dict(), cache=self.cache)
+            products, category_name = asyncio.run(self.extract_first_successful(fetcher, urls))
+            
+            if products:
+                # Save to files
+                json_file, csv_file = self.save_to_files(products, category_name)
                 
-                html_content = self.get_page_content(url)
-                if html_content and "Hot New Releases" in html_content:
-                    print(f"✅ URL {i} successful!")
-                    
-                    # Extract products
-                    products, category_name = self.extract_products_from_html(html_content)
-                    
-                    if products:
-                        # Save to files
-                        json_file, csv_file = self.save_to_files(products, category_name)
-                        
-                        # Display results
-                        print(f"\n🎉 EXTRACTION COMPLETED SUCCESSFULLY!")
-                        print(f"📊 Category: {category_name}")
-                        print(f"🛍️ Products extracted: {len(products)}")
-                        print(f"📄 JSON file: {json_file}")
-                        print(f"📊 CSV file: {csv_file}")
-                        
-                        print(f"\n📋 EXTRACTED PRODUCTS:")
-                        for i, product in enumerate(products, 1):
-                            print(f"\n{i}. {product['title']}")
-                            print(f"   Price: {product['price']}")
-                            print(f"   Rating: {product['rating']}")
-                            print(f"   Ranking: {product['ranking']}")
-                        
-                        return True
-                    else:
-                        print(f"⚠️ URL {i} - No products extracted")
-                else:
-                    print(f"❌ URL {i} - No content or blank page")
+                # Append this run to the product history database
+                record_products(products, category_name)
+                
+                # Display results
+                print(f"\n🎉 EXTRACTION COMPLETED SUCCESSFULLY!")
+                print(f"📊 Category: {category_name}")
+                print(f"🛍️ Products extracted: {len(products)}")
+                print(f"📄 JSON file: {json_file}")
+                print(f"📊 CSV file: {csv_file}")
+                
+                print(f"\n📋 EXTRACTED PRODUCTS:")
+                for i, product in enumerate(products, 1):
+                    print(f"\n{i}. {product['title']}")
+                    print(f"   Price: {product['price']}")
+                    print(f"   Rating: {product['rating']}")
+                    print(f"   Ranking: {product['ranking']}")
+                
+                return True
             
             print("❌ All URLs failed")
             return False
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Async Page Fetcher
+Fetches batches of category and product URLs concurrently with per-host limits, rate limiting and retries
+"""
+
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from http_fetcher import BROWSER_HEADERS
+from offline_extractor import OfflineProductExtractor
+from request_scheduler import get_scheduler
+from response_cache import ResponseCache
+from session_store import SessionStore
+
+# Responses worth retrying - everything else is returned as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class AsyncPageFetcher:
+    """Concurrent fetcher that streams (url, status, body) results as they arrive"""
+
+    def __init__(self, per_host_limit=4, max_retries=3, backoff=0.5, timeout=20, cookies=None, cache=None,
+                 scheduler=None):
+        """cache is an optional response_cache.ResponseCache; fresh hits skip the network and the rate limit
+
+        Requests are paced by scheduler, the process-wide
+        request_scheduler budget by default.
+        """
+        self.per_host_limit = per_host_limit
+        self.scheduler = scheduler or get_scheduler()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cookies = cookies or {}
+        self.cache = cache
+
+    @classmethod
+    def from_saved_session(cls, store=None, **kwargs):
+        """Fetcher that sends the cookies saved by session_store"""
+        session = (store or SessionStore()).load()
+        cookies = {cookie['name']: cookie['value'] for cookie in session['cookies']} if session else {}
+        return cls(cookies=cookies, **kwargs)
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """Fetcher that sends a logged-in browser's cookies"""
+        cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+        return cls(cookies=cookies, **kwargs)
+
+    async def fetch(self, session, url, semaphores):
+        """Fetch one URL, retrying transient failures with exponential backoff"""
+        entry = self.cache.get(url) if self.cache else None
+        if entry and entry['fresh']:
+            print(f"Cache hit for {url} ({len(entry['body'])} bytes)")
+            return url, 200, entry['body']
+        validators = self.cache.validators(entry) if self.cache else {}
+
+        host = urlsplit(url).netloc
+        semaphore = semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        status = None
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with semaphore:
+                await self.scheduler.wait_async(url)
+                started = time.perf_counter()
+                try:
+                    async with session.get(url, headers=validators) as response:
+                        status = response.status
+                        if status == 304 and entry:
+                            self.cache.refresh(url)
+                            print(f"Revalidated {url} (304 Not Modified)")
+                            return url, 200, entry['body']
+                        if status not in RETRY_STATUSES:
+                            body = await response.read()
+                            elapsed_ms = (time.perf_counter() - started) * 1000
+                            print(f"Fetched {url} ({status}, {len(body)} bytes, {elapsed_ms:.0f} ms)")
+                            if status == 200 and self.cache:
+                                self.cache.put(url, response.headers, body)
+                            return url, status, body
+                        retry_after = response.headers.get('Retry-After')
+                        print(f"HTTP {status} for {url} (attempt {attempt + 1})")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Error fetching {url} (attempt {attempt + 1}): {str(e) or type(e).__name__}")
+
+            if attempt < self.max_retries:
+                delay = self.backoff * (2 ** attempt)
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                await asyncio.sleep(delay)
+
+        return url, status, None
+
+    async def stream(self, urls):
+        """Async generator yielding (url, status, body) in completion order; body is None on failure
+
+        Leaving the loop early cancels the fetches that are still running.
+        """
+        semaphores = {}
+        connector = aiohttp.TCPConnector(limit_per_host=self.per_host_limit, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(headers=BROWSER_HEADERS, cookies=self.cookies,
+                                         connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.ensure_future(self.fetch(session, url, semaphores)) for url in urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_products(self, urls, max_products=5):
+        """Async generator yielding (url, products, category_name), parsing each page as soon as it arrives"""
+        parser = OfflineProductExtractor()
+        async for url, status, body in self.stream(urls):
+            if body is None or status != 200:
+                yield url, [], "Hot New Releases - Unknown Category"
+                continue
+            products, category_name = parser.extract_from_source(body, max_products)
+            yield url, products, category_name
+
+    def fetch_first(self, urls, accept):
+        """Return (url, body) of the first response whose text passes accept(), or (None, None)"""
+        async def first():
+            async for url, status, body in self.stream(urls):
+                if status == 200 and body and accept(body.decode('utf-8', errors='replace')):
+                    return url, body
+            return None, None
+
+        return asyncio.run(first())
+
+    def fetch_products(self, urls, max_products=5):
+        """Fetch and parse every URL - returns a list of (url, products, category_name)"""
+        async def collect():
+            return [result async for result in self.stream_products(urls, max_products)]
+
+        return asyncio.run(collect())
+
+def main():
+    """Fetch the URLs given on the command line concurrently with the saved session"""
+    if len(sys.argv) < 2:
+        print("Usage: python async_fetcher.py <url> [<url> ...]")
+        sys.exit(1)
+
+    fetcher = AsyncPageFetcher.from_saved_session(cache=ResponseCache())
+    started = time.perf_counter()
+    results = fetcher.fetch_products(sys.argv[1:])
+    elapsed = time.perf_counter() - started
+
+    for url, products, category_name in results:
+        print(f"{url}: {category_name} - {len(products)} products")
+    print(f"Fetched and parsed {len(results)} pages in {elapsed:.2f}s")
+    fetcher.scheduler.print_stats()
+    print(json.dumps([{'url': url, 'category': category_name, 'products': products}
+                      for url, products, category_name in results], indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Bulk Product Extractor
+Extracts every product record from the current page with a single execute_script call
+"""
+
+from datetime import datetime
+from layout_fingerprint import (get_layout_registry, fingerprint_from_counts, LAYOUT_JS_FUNCTIONS, LAYOUT_MARKERS,
+                                COUNT_BUCKETS)
+from product_fields import ASIN_PATTERN, extract_asin
+
+# Container locators, tried in order - the first one that matches anything wins
+CONTAINER_LOCATORS = [
+    "//div[@class='zg-item-immersion']",
+    "//div[contains(@class, 'zg-item')]",
+    "//div[contains(@class, 'item')]",
+    "//div[contains(@class, 'product')]",
+    "//a[contains(@href, '/dp/')]"
+]
+
+# Same cascades the extractor classes use in get_product_title/price/rating
+TITLE_SELECTORS = [
+    ".//span[@class='a-size-base-plus a-color-base a-text-normal']",
+    ".//h2//span",
+    ".//h3//span",
+    ".//a[@class='a-link-normal']//span",
+    ".//span[contains(@class, 'a-size')]",
+    ".//a[contains(@class, 'a-link')]//span",
+    ".//span[contains(@class, 'text')]",
+    ".//div[contains(@class, 'title')]//span",
+    ".//div[contains(@class, 'name')]//span"
+]
+
+PRICE_SELECTORS = [
+    ".//span[@class='a-price-whole']",
+    ".//span[contains(@class, 'a-price')]//span[contains(@class, 'a-offscreen')]",
+    ".//span[contains(@class, 'price')]",
+    ".//span[contains(text(), '₹')]",
+    ".//span[contains(text(), '$')]",
+    ".//span[contains(@class, 'a-price-symbol')]/following-sibling::span"
+]
+
+RATING_SELECTORS = [
+    ".//span[@class='a-icon-alt']",
+    ".//span[contains(@class, 'a-icon-alt')]",
+    ".//span[contains(@class, 'rating')]",
+    ".//span[contains(text(), 'out of')]",
+    ".//span[contains(text(), 'stars')]"
+]
+
+RANK_SELECTORS = [
+    ".//span[contains(@class, 'zg-bdg-text')]",
+    ".//span[contains(text(), '#')]",
+    ".//span[contains(@class, 'badge')]",
+    ".//span[contains(@class, 'rank')]"
+]
+
+# Runs entirely inside the browser and returns plain JSON, so the whole
+# extraction - layout fingerprint included - costs one WebDriver round trip
+# instead of one per selector try
+EXTRACT_PRODUCTS_JS = LAYOUT_JS_FUNCTIONS + r"""
+var args = arguments[0];
+var started = performance.now();
+
+// Known selectors of this page's layout go first in each cascade
+var layoutCounts = countMarkers(args.markers);
+var profile = args.profiles[layoutSignature(layoutCounts, args.markers, args.buckets)] || null;
+
+function preferredFirst(candidates, preferred) {
+    if (!preferred) {
+        return candidates;
+    }
+    return [preferred].concat(candidates.filter(function (candidate) { return candidate !== preferred; }));
+}
+
+var containerLocators = preferredFirst(args.containers, profile && profile.container);
+var titleSelectors = preferredFirst(args.title, profile && profile.title);
+var priceSelectors = preferredFirst(args.price, profile && profile.price);
+var ratingSelectors = preferredFirst(args.rating, profile && profile.rating);
+
+function xpathAll(expr, context) {
+    var nodes = [];
+    try {
+        var result = document.evaluate(expr, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+    } catch (e) {}
+    return nodes;
+}
+
+function textOf(node) {
+    var text = node.innerText;
+    if (!text || !text.trim()) {
+        text = node.textContent || '';
+    }
+    return text.replace(/\s+/g, ' ').trim();
+}
+
+// Selector that first produced each field, reported back for the layout registry
+var matched = {};
+
+function firstMatch(container, selectors, accept, field) {
+    for (var i = 0; i < selectors.length; i++) {
+        var nodes = xpathAll(selectors[i], container);
+        for (var j = 0; j < nodes.length; j++) {
+            var text = textOf(nodes[j]);
+            if (accept(text)) {
+                if (field && !matched[field]) {
+                    matched[field] = selectors[i];
+                }
+                return text;
+            }
+        }
+    }
+    return null;
+}
+
+function fallbackTitle(container) {
+    var nodes = xpathAll('.//span | .//a | .//h1 | .//h2 | .//h3 | .//div', container);
+    for (var i = 0; i < nodes.length; i++) {
+        var text = textOf(nodes[i]);
+        if (text.length > 10 && text.length < 200) {
+            return text;
+        }
+    }
+    return null;
+}
+
+function productLink(container) {
+    if (container.tagName === 'A' && container.href && container.href.indexOf('/dp/') !== -1) {
+        return container.href;
+    }
+    var anchors = xpathAll(".//a[contains(@href, '/dp/')]", container);
+    return anchors.length ? anchors[0].href : null;
+}
+
+// Optional root (e.g. one category section) that scopes the container search
+var root = document;
+if (args.root) {
+    root = xpathAll(args.root, document)[0] || null;
+}
+
+var containers = [];
+var usedLocator = null;
+for (var i = 0; root && i < containerLocators.length; i++) {
+    containers = xpathAll(root === document ? containerLocators[i] : '.' + containerLocators[i], root);
+    if (containers.length) {
+        usedLocator = containerLocators[i];
+        break;
+    }
+}
+
+// Nested or repeated containers of one product share its ASIN - keep the first
+var asinPattern = new RegExp(args.asin_pattern);
+var seenAsins = {};
+
+var products = [];
+for (var c = 0; c < containers.length && products.length < args.max; c++) {
+    var container = containers[c];
+    var link = productLink(container);
+    var asinMatch = link ? asinPattern.exec(link) : null;
+    if (asinMatch && seenAsins[asinMatch[1]]) {
+        continue;
+    }
+    var title = firstMatch(container, titleSelectors, function (t) { return t.length > 5; }, 'title') || fallbackTitle(container);
+    var price = firstMatch(container, priceSelectors, function (t) { return t.indexOf('₹') !== -1 || t.indexOf('$') !== -1; }, 'price');
+    var rating = firstMatch(container, ratingSelectors, function (t) { return t.indexOf('out of') !== -1 || t.indexOf('stars') !== -1; }, 'rating');
+    var rankText = firstMatch(container, args.rank, function (t) { return /#\s*\d+/.test(t); });
+    if (!title && !price) {
+        continue;
+    }
+    var rankMatch = rankText ? rankText.match(/#\s*(\d+)/) : null;
+    if (asinMatch) {
+        seenAsins[asinMatch[1]] = true;
+    }
+    products.push({
+        title: title,
+        price: price,
+        rating: rating,
+        rank: rankMatch ? parseInt(rankMatch[1], 10) : null,
+        link: link
+    });
+}
+
+return {
+    products: products,
+    locator: usedLocator,
+    selectors: matched,
+    root_found: root !== null,
+    containers: containers.length,
+    layout_counts: layoutCounts,
+    known_layout: profile !== null,
+    elapsed_ms: performance.now() - started
+};
+"""
+
+
+def extract_products_in_browser(driver, max_products=5, root_xpath=None, registry=None):
+    """Extract up to max_products product records in one execute_script round trip
+
+    Returns a list of product dictionaries in the same shape the extractor
+    classes produce (ranking, asin, title, price, rating, extracted_at) plus
+    the Amazon rank badge and the /dp/ link; containers repeating an ASIN
+    already extracted are skipped. With root_xpath only containers
+    inside the first matching element are used. Returns an empty list on
+    failure so callers can fall back to the per-element cascade.
+
+    The same script fingerprints the page layout. For a layout in the
+    registry its known selectors are tried before the rest of each cascade;
+    the selectors that worked are learned, and a known layout on which
+    nothing was found is forgotten.
+    """
+    try:
+        registry = registry or get_layout_registry()
+        result = driver.execute_script(EXTRACT_PRODUCTS_JS, {
+            'containers': CONTAINER_LOCATORS,
+            'title': TITLE_SELECTORS,
+            'price': PRICE_SELECTORS,
+            'rating': RATING_SELECTORS,
+            'rank': RANK_SELECTORS,
+            'max': max_products,
+            'root': root_xpath,
+            'asin_pattern': ASIN_PATTERN.pattern,
+            'markers': [list(marker) for marker in LAYOUT_MARKERS],
+            'buckets': COUNT_BUCKETS,
+            'profiles': registry.profiles_by_signature()
+        })
+        if not result:
+            return []
+        if not result['root_found']:
+            print(f"Bulk extraction root not found: {root_xpath}")
+            return []
+
+        counts = {name: int(count) for name, count in result['layout_counts'].items()}
+        fingerprint = fingerprint_from_counts(counts)
+        print(f"Bulk extraction scanned {result['containers']} containers "
+              f"using {result['locator']} in {result['elapsed_ms']:.1f} ms "
+              f"({'known' if result['known_layout'] else 'new'} layout {fingerprint})")
+        if result['products']:
+            registry.learn(fingerprint, counts, dict(result['selectors'], container=result['locator']))
+        elif result['known_layout']:
+            # The layout's learned selectors no longer find anything - stop putting them first
+            registry.forget(fingerprint)
+
+        extracted_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        products = []
+        for record in result['products']:
+            products.append({
+                'ranking': len(products) + 1,
+                'asin': extract_asin(record['link']),
+                'title': record['title'] or "No Title Available",
+                'price': record['price'] or "Price Not Available",
+                'rating': record['rating'] or "No Rating Available",
+                'rank': record['rank'],
+                'link': record['link'],
+                'extracted_at': extracted_at
+            })
+        return products
+
+    except Exception as e:
+        print(f"Error in bulk extraction: {str(e)}")
+        return []
+
+
+# Returns the text of the first heading matching any of the xpaths that
+# contains the marker, checked in the browser in one call
+CATEGORY_NAME_JS = r"""
+var xpaths = arguments[0];
+var marker = arguments[1];
+for (var i = 0; i < xpaths.length; i++) {
+    try {
+        var result = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var j = 0; j < result.snapshotLength; j++) {
+            var text = (result.snapshotItem(j).innerText || '').replace(/\s+/g, ' ').trim();
+            if (text.indexOf(marker) !== -1) {
+                return text;
+            }
+        }
+    } catch (e) {}
+}
+return null;
+"""
+
+
+def get_category_name_in_browser(driver, xpaths, marker='Hot New Releases'):
+    """Return the first category heading containing marker, or None if there is none"""
+    try:
+        return driver.execute_script(CATEGORY_NAME_JS, list(xpaths), marker)
+    except Exception as e:
+        print(f"Error reading category name: {str(e)}")
+        return None
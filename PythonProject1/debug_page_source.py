@@ -4,14 +4,17 @@ Debug script to capture Amazon page source and analyze the structure
 """
 
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import json
+from offline_extractor import OfflineProductExtractor, node_text
+from page_snapshot import page_snapshot
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
 
 def setup_driver():
     """Setup Chrome driver with options"""
@@ -23,7 +26,7 @@ def setup_driver():
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
-    service = Service(ChromeDriverManager().install())
+    service = create_chrome_service()
     driver = webdriver.Chrome(service=service, options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
@@ -33,7 +36,7 @@ def login_to_amazon(driver, email, password):
     """Login to Amazon"""
     try:
         print("🔐 Logging into Amazon...")
-        driver.get("https://www.amazon.in/ap/signin")
+        scheduled_get(driver, "https://www.amazon.in/ap/signin")
         
         # Wait for email field
         email_field = WebDriverWait(driver, 10).until(
@@ -43,7 +46,7 @@ def login_to_amazon(driver, email, password):
         
         # Click continue
         continue_btn = driver.find_element(By.ID, "continue")
-        continue_btn.click()
+        scheduled_click(driver, continue_btn)
         
         # Wait for password field
         password_field = WebDriverWait(driver, 10).until(
@@ -53,7 +56,7 @@ def login_to_amazon(driver, email, password):
         
         # Click sign in
         signin_btn = driver.find_element(By.ID, "signInSubmit")
-        signin_btn.click()
+        scheduled_click(driver, signin_btn)
         
         # Wait for login to complete
         WebDriverWait(driver, 15).until(
@@ -70,22 +73,21 @@ def capture_page_source(driver, url, filename):
     """Capture page source and save to file"""
     try:
         print(f"🌐 Navigating to: {url}")
-        driver.get(url)
+        scheduled_get(driver, url)
         
-        # Wait for page to load
-        time.sleep(5)
+        # Wait for the product grid to render and the DOM to settle
+        wait_for_page_ready(driver, PRODUCT_GRID_XPATH)
         
-        # Get page title
-        page_title = driver.title
+        # Title and source come from one snapshot shared with the analysis below
+        snapshot = page_snapshot(driver)
+        if snapshot is None:
+            return None, 0
+        page_title = snapshot.title
         print(f"📄 Page Title: {page_title}")
-        
-        # Get page source
-        page_source = driver.page_source
-        print(f"📝 Page source length: {len(page_source)} characters")
+        print(f"📝 Page source length: {len(snapshot.source)} characters")
         
         # Save page source to file
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(page_source)
+        snapshot.save(filename)
         print(f"💾 Page source saved to: {filename}")
         
         # Take screenshot
@@ -93,16 +95,17 @@ def capture_page_source(driver, url, filename):
         driver.save_screenshot(screenshot_name)
         print(f"📸 Screenshot saved to: {screenshot_name}")
         
-        return page_title, len(page_source)
+        return page_title, len(snapshot.source)
         
     except Exception as e:
         print(f"❌ Error capturing page source: {e}")
         return None, 0
 
 def analyze_page_structure(driver):
-    """Analyze the page structure to find relevant elements"""
+    """Analyze the page structure to find relevant elements, using the page snapshot instead of live lookups"""
     try:
         print("\n🔍 Analyzing page structure...")
+        root = page_snapshot(driver).tree
         
         # Check for various elements
         elements_to_check = [
@@ -123,7 +126,7 @@ def analyze_page_structure(driver):
         
         for description, xpath in elements_to_check:
             try:
-                elements = driver.find_elements(By.XPATH, xpath)
+                elements = root.xpath(xpath)
                 count = len(elements)
                 analysis_results[description] = count
                 
@@ -131,7 +134,7 @@ def analyze_page_structure(driver):
                     print(f"  {description}: {count}")
                     for i, element in enumerate(elements[:5]):  # Show first 5
                         try:
-                            text = element.text.strip()
+                            text = node_text(element)
                             if text and len(text) < 100:
                                 print(f"    {i+1}: {text}")
                         except:
@@ -168,7 +171,7 @@ def main():
         driver = setup_driver()
         
         # Login
-        if not login_to_amazon(driver, email, password):
+        if not ensure_logged_in(driver, lambda: login_to_amazon(driver, email, password)):
             print("❌ Cannot proceed without login")
             return
         
@@ -186,10 +189,19 @@ def main():
             # Analyze page structure
             analysis = analyze_page_structure(driver)
             
+            # Grid-only capture - all offline extraction needs, at a fraction of the size
+            grid = page_snapshot(driver, scope='grid') or page_snapshot(driver)
+            grid.save("amazon_new_releases_grid.html")
+            
+            # Re-extract from the grid capture without touching the browser
+            products, category_name = OfflineProductExtractor().extract_from_snapshot(grid)
+            
             print(f"\n✅ Debug complete!")
             print(f"📄 Page title: {page_title}")
             print(f"📝 Source length: {source_length}")
+            print(f"📦 Grid capture: {grid.captured_bytes} of {grid.full_bytes} bytes ({grid.bytes_saved} saved)")
             print(f"📊 Found {len(analysis)} element types")
+            print(f"🛍️ Offline extraction: {len(products)} products in {category_name}")
             
         else:
             print("❌ Failed to capture page source")
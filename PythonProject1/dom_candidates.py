@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+DOM Candidate Finder
+Scores elements inside the browser and returns only the best product-like containers with their text in one call
+"""
+
+from product_fields import ASIN_PATTERN
+
+# Scores every element matching the tag inside the browser. A good product
+# container holds exactly one product (one distinct /dp/ ASIN), a price and
+# a rating in a short block of text; grids holding many products score low.
+# Only the top candidates cross the WebDriver wire, nested duplicates removed.
+FIND_CANDIDATES_JS = r"""
+var args = arguments[0];
+var started = performance.now();
+var root = args.root ? document.evaluate(args.root, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue : document;
+if (!root) {
+    return {candidates: [], total: 0, scanned: 0, elapsed_ms: performance.now() - started};
+}
+
+var asinPattern = new RegExp(args.asin_pattern);
+var elements = root.getElementsByTagName(args.tag);
+var scored = [];
+
+for (var i = 0; i < elements.length; i++) {
+    var element = elements[i];
+    var text = element.textContent || '';
+    if (text.length < args.min_text || text.length > args.max_text) {
+        continue;
+    }
+
+    var score = 0;
+    if (text.indexOf('₹') !== -1 || text.indexOf('$') !== -1) {
+        score += 3;
+    }
+    if (text.indexOf('out of') !== -1 || text.indexOf('stars') !== -1) {
+        score += 2;
+    }
+    if (/add to cart|buy now/i.test(text)) {
+        score += 1;
+    }
+
+    var asins = {};
+    var asinCount = 0;
+    var links = element.querySelectorAll('a[href*="/dp/"], a[href*="/gp/product/"]');
+    for (var j = 0; j < links.length; j++) {
+        var match = asinPattern.exec(links[j].getAttribute('href'));
+        var asin = match ? match[1] : links[j].getAttribute('href');
+        if (!asins[asin]) {
+            asins[asin] = true;
+            asinCount++;
+        }
+    }
+    if (asinCount === 1) {
+        score += 4;
+    } else if (asinCount > 1) {
+        score -= 2 * (asinCount - 1);
+    }
+
+    // Dense blocks of text beat sprawling wrappers with the same markers
+    if (text.length < 500) {
+        score += 1;
+    }
+
+    if (score >= args.min_score) {
+        scored.push({element: element, score: score, links: asinCount, order: i});
+    }
+}
+
+scored.sort(function (a, b) { return b.score - a.score || a.order - b.order; });
+
+var picked = [];
+for (var k = 0; k < scored.length && picked.length < args.top_n; k++) {
+    var candidate = scored[k];
+    var overlaps = false;
+    for (var p = 0; p < picked.length; p++) {
+        if (picked[p].element.contains(candidate.element) || candidate.element.contains(picked[p].element)) {
+            overlaps = true;
+            break;
+        }
+    }
+    if (!overlaps) {
+        picked.push(candidate);
+    }
+}
+
+// Back in page order, so rankings follow what the user sees
+picked.sort(function (a, b) { return a.order - b.order; });
+
+return {
+    candidates: picked.map(function (c) {
+        return {
+            element: c.element,
+            text: (c.element.innerText || c.element.textContent || '').replace(/[ \t]+/g, ' ').replace(/\s*\n\s*/g, '\n').trim(),
+            score: c.score,
+            links: c.links
+        };
+    }),
+    total: scored.length,
+    scanned: elements.length,
+    elapsed_ms: performance.now() - started
+};
+"""
+
+
+def find_candidate_containers(driver, top_n=10, tag='div', root_xpath=None, min_score=4, min_text=20, max_text=3000):
+    """Return the top_n most product-like elements as [{'element', 'text', 'score', 'links'}]
+
+    element is a WebElement usable with the get_product_* methods, text its
+    rendered text (one line per visual line) and links the number of distinct /dp/ or /gp/product/ products inside it.
+    Candidates are in page order and never nested in each other. Returns an
+    empty list on failure.
+    """
+    result = scan_candidates(driver, top_n, tag, root_xpath, min_score, min_text, max_text)
+    return result['candidates'] if result else []
+
+
+def scan_candidates(driver, top_n=10, tag='div', root_xpath=None, min_score=4, min_text=20, max_text=3000):
+    """Full scan result: candidates plus how many elements were scanned and how many qualified, or None"""
+    try:
+        result = driver.execute_script(FIND_CANDIDATES_JS, {
+            'top_n': top_n,
+            'tag': tag,
+            'root': root_xpath,
+            'min_score': min_score,
+            'min_text': min_text,
+            'max_text': max_text,
+            'asin_pattern': ASIN_PATTERN.pattern
+        })
+        print(f"Scored {result['scanned']} <{tag}> elements in {result['elapsed_ms']:.1f} ms: "
+              f"{result['total']} product-like, kept {len(result['candidates'])}")
+        return result
+    except Exception as e:
+        print(f"Error finding candidate containers: {str(e)}")
+        return None
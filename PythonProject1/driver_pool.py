@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+WebDriver Pool
+Keeps warm Chrome instances and hands them out per category or test instead of launching a new browser each time
+"""
+
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from driver_resolver import create_chrome_service
+from request_scheduler import scheduled_get, navigation_count
+
+# Only these functions become keywords when imported as a Robot library
+__all__ = ['configure_browser_pool', 'open_pooled_browser', 'release_pooled_browser', 'close_browser_pool']
+
+CLEAR_STORAGE_JS = "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+
+def clear_browser_storage(driver):
+    """Clear cookies, localStorage and sessionStorage of the driver's current site"""
+    driver.execute_script(CLEAR_STORAGE_JS)
+    driver.delete_all_cookies()
+
+def create_chrome_driver(headless=False):
+    """Launch Chrome with the same options the extractors use"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+    service = create_chrome_service()
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver.maximize_window()
+    return driver
+
+class DriverPool:
+    """Pool of warm WebDriver instances shared across categories and tests"""
+
+    def __init__(self, factory=None, max_size=2, max_navigations=40, headless=False):
+        """factory() must return a new driver; by default Chrome is launched with create_chrome_driver
+
+        A driver is quit instead of reused once it has made max_navigations
+        page loads. Pooled drivers' quit() hands them back to the pool, so
+        SeleniumLibrary's Close Browser releases a pooled browser; the pool
+        alone really quits them.
+        """
+        self.factory = factory or (lambda: create_chrome_driver(headless))
+        self.max_size = max_size
+        self.max_navigations = max_navigations
+        self.drivers = []
+        self.idle = []
+        self.quit_functions = {}
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Return an idle driver, launching a new one while the pool is below max_size"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.idle or len(self.drivers) < self.max_size, timeout):
+                raise TimeoutError(f"No pooled driver became free within {timeout}s")
+            if self.idle:
+                print(f"Reusing warm pooled driver ({len(self.drivers)}/{self.max_size})")
+                return self.idle.pop()
+            # Reserve the slot before launching so other threads see the pool as full
+            self.drivers.append(None)
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self.condition:
+                self.drivers.remove(None)
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.drivers[self.drivers.index(None)] = driver
+            self.quit_functions[driver] = driver.quit
+            driver.quit = lambda: self.release(driver)
+            print(f"Launched pooled driver ({len(self.drivers)}/{self.max_size})")
+        return driver
+
+    def reset(self, driver, clear_storage=False):
+        """Load about:blank, optionally clearing cookies and storage of the current site first
+
+        Returns the number of navigations the driver has made, or None if it
+        could not be reset (e.g. the browser crashed).
+        """
+        try:
+            # Page loads made by SeleniumLibrary keywords bypass the scheduler,
+            # so history.length (capped at 50 by Chrome) is kept as a floor
+            navigations = max(navigation_count(driver), driver.execute_script("return window.history.length;"))
+            if clear_storage:
+                clear_browser_storage(driver)
+            driver.get("about:blank")
+            return navigations
+        except Exception as e:
+            print(f"Could not reset pooled driver: {str(e)}")
+            return None
+
+    def release(self, driver, clear_storage=False):
+        """Reset a driver and return it to the pool, or quit it if it is worn out or broken"""
+        with self.condition:
+            if driver in self.idle or driver not in self.drivers:
+                return
+        navigations = self.reset(driver, clear_storage)
+        if navigations is None or navigations >= self.max_navigations:
+            print(f"Recycling pooled driver after {navigations} navigations")
+            self.discard(driver)
+            return
+
+        with self.condition:
+            self.idle.append(driver)
+            self.condition.notify()
+
+    def discard(self, driver):
+        """Quit a driver and free its slot"""
+        with self.condition:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+            if driver in self.idle:
+                self.idle.remove(driver)
+            quit_browser = self.quit_functions.pop(driver, driver.quit)
+            self.condition.notify()
+        try:
+            quit_browser()
+        except Exception as e:
+            print(f"Error quitting pooled driver: {str(e)}")
+
+    @contextmanager
+    def lease(self, clear_storage=False, timeout=None):
+        """with pool.lease() as driver: ... - acquire a driver and always release it"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver, clear_storage)
+
+    def close_all(self):
+        """Quit every driver the pool has launched"""
+        with self.condition:
+            drivers = [driver for driver in self.drivers if driver is not None]
+        for driver in drivers:
+            self.discard(driver)
+        print("Driver pool closed")
+
+# Pool shared by the Robot keywords below (one per Robot process)
+_robot_pool = None
+
+# Seconds Open Pooled Browser waits for a free browser before failing
+_robot_timeout = 60
+
+def get_browser_pool():
+    """Return the process-wide pool, creating it with default settings on first use"""
+    global _robot_pool
+    if _robot_pool is None:
+        _robot_pool = DriverPool()
+    return _robot_pool
+
+def configure_browser_pool(max_size=2, max_navigations=40, headless=False, timeout=60):
+    """Set the pool size, recycle threshold, headless mode and acquire timeout (closes any existing pool)"""
+    global _robot_pool, _robot_timeout
+    _robot_timeout = float(timeout)
+    if _robot_pool is not None:
+        _robot_pool.close_all()
+    _robot_pool = DriverPool(max_size=int(max_size), max_navigations=int(max_navigations), headless=headless)
+
+def _builtin():
+    from robot.libraries.BuiltIn import BuiltIn
+    return BuiltIn()
+
+def _selenium_library():
+    return _builtin().get_library_instance('SeleniumLibrary')
+
+def open_pooled_browser(url=None, alias=None, timeout=None):
+    """Borrow a warm browser from the pool and make it SeleniumLibrary's current browser
+
+    Fails with TimeoutError when no browser is free within timeout seconds
+    (the configured timeout by default), e.g. when a test leaked one.
+    """
+    driver = get_browser_pool().acquire(float(timeout) if timeout else _robot_timeout)
+    index = _selenium_library().register_driver(driver, alias)
+    if url:
+        scheduled_get(driver, url)
+    return index
+
+def release_pooled_browser(clear_storage=False):
+    """Hand SeleniumLibrary's current browser back to the pool without quitting it"""
+    if clear_storage:
+        clear_browser_storage(_selenium_library().driver)
+    # Close Browser calls the pooled driver's quit(), which returns it to the pool
+    _builtin().run_keyword('SeleniumLibrary.Close Browser')
+
+def close_browser_pool():
+    """Quit every pooled browser (use in Suite Teardown)"""
+    if _robot_pool is not None:
+        _robot_pool.close_all()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+ChromeDriver Resolver
+Resolves chromedriver once and reuses the recorded path on later starts, even without network access
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from selenium.webdriver.chrome.service import Service
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chromedriver_manifest.json')
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+\.\d+')
+
+CHROME_COMMANDS = [
+    ['google-chrome', '--version'],
+    ['google-chrome-stable', '--version'],
+    ['chromium', '--version'],
+    ['chromium-browser', '--version'],
+    ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version']
+]
+
+# Resolved path for this process, so every driver launch after the first is free
+_resolved_path = None
+
+def detect_chrome_version():
+    """Return the installed Chrome version (e.g. '120.0.6099.110'), or None if it cannot be found"""
+    if sys.platform == 'win32':
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Google\Chrome\BLBeacon') as key:
+                return winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            return None
+
+    for command in CHROME_COMMANDS:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(0)
+    return None
+
+def major_version(version):
+    """Major part of a version string - chromedriver only has to match Chrome's major version"""
+    match = VERSION_PATTERN.search(version or '')
+    return match.group(1) if match else None
+
+def load_manifest():
+    """Return the recorded chromedriver resolution, or None"""
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(driver_path, chrome_version):
+    """Record the resolved chromedriver path and the Chrome version it was resolved for"""
+    try:
+        with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'driver_path': driver_path,
+                'chrome_version': chrome_version,
+                'resolved_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }, f, indent=2)
+    except OSError as e:
+        print(f"Could not write chromedriver manifest: {str(e)}")
+
+def resolve_chromedriver_path(force=False):
+    """Return a chromedriver path, calling webdriver_manager only when the manifest is missing or stale
+
+    The manifest is stale when its driver file is gone or the local Chrome
+    major version changed. If Chrome's version cannot be detected the
+    recorded driver is trusted. Returns None when nothing could be resolved.
+    """
+    global _resolved_path
+    if _resolved_path and not force:
+        return _resolved_path
+
+    chrome_version = detect_chrome_version()
+    manifest = load_manifest()
+    cached_path = manifest['driver_path'] if manifest and os.path.isfile(manifest.get('driver_path', '')) else None
+
+    if cached_path and not force:
+        if chrome_version is None or major_version(chrome_version) == major_version(manifest.get('chrome_version')):
+            _resolved_path = cached_path
+            return cached_path
+        print(f"Chrome changed from {manifest.get('chrome_version')} to {chrome_version}, resolving chromedriver again")
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        started = time.perf_counter()
+        driver_path = ChromeDriverManager().install()
+        print(f"Resolved chromedriver in {time.perf_counter() - started:.2f}s: {driver_path}")
+        save_manifest(driver_path, chrome_version)
+        _resolved_path = driver_path
+        return driver_path
+    except Exception as e:
+        print(f"webdriver_manager could not resolve chromedriver: {str(e)}")
+
+    if cached_path:
+        print(f"Falling back to recorded chromedriver: {cached_path}")
+        _resolved_path = cached_path
+    return cached_path
+
+def create_chrome_service():
+    """Chrome Service for the resolved chromedriver (Selenium's own lookup if none was found)"""
+    driver_path = resolve_chromedriver_path()
+    return Service(driver_path) if driver_path else Service()
+
+if __name__ == "__main__":
+    print(resolve_chromedriver_path(force='--force' in sys.argv))
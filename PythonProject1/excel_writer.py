@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Excel Workbook Writer
+Streams products into a native .xlsx workbook with one sheet per category and numeric price and rating cells
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from product_fields import parse_price, parse_rating
+
+# (header, width, number format) - price and rating are numbers, their
+# original text is kept next to them for values that did not parse
+COLUMNS = [
+    ('ranking', 9, '0'),
+    ('asin', 13, None),
+    ('title', 60, None),
+    ('price', 12, '#,##0.00'),
+    ('rating', 8, '0.0'),
+    ('price_text', 18, None),
+    ('rating_text', 20, None),
+    ('category', 40, None),
+    ('extracted_at', 20, 'yyyy-mm-dd hh:mm:ss')
+]
+
+TIMESTAMP_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y%m%d_%H%M%S']
+
+# Excel sheet names: at most 31 characters and none of these
+INVALID_SHEET_CHARACTERS = re.compile(r'[\[\]:*?/\\]')
+
+SHEET_NAME_LENGTH = 31
+
+def parse_timestamp(value):
+    """datetime of an extracted_at value in any format the extractors write, else the value unchanged"""
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(str(value), timestamp_format)
+        except ValueError:
+            continue
+    return value
+
+def sheet_name(category_name, used_names):
+    """Valid sheet name for a category, unique among used_names (compared case-insensitively as Excel does)"""
+    name = INVALID_SHEET_CHARACTERS.sub('_', category_name or 'Unknown Category')
+    name = re.sub(r'^Hot New Releases in ', '', name).strip("' ") or 'Unknown Category'
+    candidate = name[:SHEET_NAME_LENGTH]
+    suffix = 1
+    while candidate.lower() in used_names:
+        suffix += 1
+        candidate = f"{name[:SHEET_NAME_LENGTH - len(str(suffix)) - 1]}~{suffix}"
+    used_names.add(candidate.lower())
+    return candidate
+
+class ExcelProductWriter:
+    """Writes products into an .xlsx workbook in openpyxl's write-only mode
+
+    Each category gets its own sheet, created the first time one of its
+    products arrives; products may come in any category order. Rows are
+    streamed to the sheets' temporary files as they are written, so
+    memory use does not grow with the number of rows. save() writes the
+    workbook to a .part file and renames it into place.
+    """
+
+    def __init__(self, filename, category_name=None):
+        self.filename = filename
+        self.category_name = category_name
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+        self.sheet_names = set()
+        self.count = 0
+
+    def sheet_for(self, category):
+        """The category's sheet, created with its header row, column widths and frozen header on first use"""
+        sheet = self.sheets.get(category)
+        if sheet is None:
+            sheet = self.workbook.create_sheet(sheet_name(category, self.sheet_names))
+            # Write-only sheets take layout settings only before the first row
+            for index, (_, width, _) in enumerate(COLUMNS):
+                sheet.column_dimensions[get_column_letter(index + 1)].width = width
+            sheet.freeze_panes = 'A2'
+            header = []
+            for header_name, _, _ in COLUMNS:
+                cell = WriteOnlyCell(sheet, value=header_name)
+                cell.font = Font(bold=True)
+                header.append(cell)
+            sheet.append(header)
+            self.sheets[category] = sheet
+        return sheet
+
+    def write(self, product):
+        """Append one product to its category's sheet"""
+        category = product.get('category') or self.category_name or 'Unknown Category'
+        sheet = self.sheet_for(category)
+        values = {
+            'ranking': product.get('ranking'),
+            'asin': product.get('asin'),
+            'title': product.get('title'),
+            'price': parse_price(product.get('price')),
+            'rating': parse_rating(product.get('rating')),
+            'price_text': product.get('price'),
+            'rating_text': product.get('rating'),
+            'category': category,
+            'extracted_at': parse_timestamp(product.get('extracted_at'))
+        }
+        row = []
+        for header_name, _, number_format in COLUMNS:
+            value = values[header_name]
+            # Only formatted numbers need a styled cell; plain values are written as they are
+            if number_format and value is not None:
+                value = WriteOnlyCell(sheet, value=value)
+                value.number_format = number_format
+            row.append(value)
+        sheet.append(row)
+        self.count += 1
+
+    def save(self):
+        """Write the workbook to filename - returns the number of products written
+
+        A workbook needs at least one sheet, so an empty run still gets
+        one with just the header row.
+        """
+        if not self.sheets:
+            self.sheet_for(self.category_name or 'Unknown Category')
+        self.workbook.save(self.filename + '.part')
+        os.replace(self.filename + '.part', self.filename)
+        print(f"Products saved to Excel file: {self.filename} ({self.count} rows, {len(self.sheets)} sheets)")
+        return self.count
+
+def write_products_excel(filename, products, category_name=None):
+    """Write products to an .xlsx workbook, one sheet per category - returns filename, or None on failure
+
+    Products keep their own 'category' when they have one (merged
+    multi-category results); category_name is used for the rest.
+    products may be any iterable, e.g. a generator over a large export.
+    """
+    try:
+        writer = ExcelProductWriter(filename, category_name)
+        for product in products:
+            writer.write(product)
+        writer.save()
+        return filename
+    except Exception as e:
+        print(f"Error saving to Excel: {str(e)}")
+        return None
+
+def history_products(history, categories=None, since=None, until=None):
+    """Observations from the product history store as product records, read row by row from the cursor"""
+    sql = """
+        SELECT o.ranking, p.product_key, o.title, o.price, o.rating, c.name AS category, o.extracted_at
+        FROM observations o
+        JOIN products p ON p.id = o.product_id
+        JOIN categories c ON c.id = o.category_id
+        WHERE o.extracted_at >= ? AND o.extracted_at < ?
+    """
+    parameters = [since or '', until or '9999']
+    if categories:
+        sql += f" AND c.name IN ({', '.join('?' * len(categories))})"
+        parameters.extend(categories)
+    sql += " ORDER BY c.name, o.extracted_at, o.ranking"
+    for row in history.connection().execute(sql, parameters):
+        product = dict(row)
+        key = product.pop('product_key')
+        product['asin'] = None if key.startswith('title:') else key
+        yield product
+
+def main():
+    """Export the product history (optionally some categories) to one workbook"""
+    if len(sys.argv) < 2:
+        print("Usage: python excel_writer.py <file.xlsx> [category ...]")
+        sys.exit(1)
+
+    # Only the CLI reads the history store
+    from product_history import get_product_history
+    products = history_products(get_product_history(), sys.argv[2:] or None)
+    sys.exit(0 if write_products_excel(sys.argv[1], products) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+File Lock
+Cross-process lock around read-merge-write updates of the shared JSON state files
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+@contextmanager
+def locked_file(filename, timeout=10, stale_after=30):
+    """with locked_file(path): ... - hold <path>.lock so only one process updates path at a time
+
+    The lock file is created exclusively, which works the same on Windows
+    and Linux. One older than stale_after seconds was left behind by a
+    crashed process and is taken over. Raises TimeoutError after timeout
+    seconds.
+    """
+    lock_path = filename + '.lock'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                # Released between the two calls - try again right away
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock {filename} within {timeout}s")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """
 File Writer Helper for Robot Framework
-Handles JSON and CSV file writing without syntax issues
+Handles JSON, CSV and Excel file writing in-process as a Robot library, or from the command line
 """
 
 import json
 import csv
+import os
 import sys
+from excel_writer import write_products_excel
+from stream_writer import CSV_FIELDS
+
+# Only these functions become keywords when imported as a Robot library
+__all__ = ['write_json_file', 'write_csv_file', 'write_excel_file']
 
 def write_json_file(filename, data):
     """Write data to JSON file"""
@@ -23,47 +29,65 @@ def write_csv_file(filename, products, category_name, timestamp):
     """Write products to CSV file"""
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS, extrasaction='ignore')
+
             writer.writeheader()
             for product in products:
-                product['category'] = category_name
-                product['extracted_at'] = timestamp
-                writer.writerow(product)
+                writer.writerow(dict(product, category=category_name, extracted_at=timestamp))
         print(f"CSV file written successfully: {filename}")
         return True
     except Exception as e:
         print(f"Error writing CSV file: {str(e)}")
         return False
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python file_writer.py <command> <args...>")
+def write_excel_file(filename, products, category_name, timestamp):
+    """Write products to a native .xlsx workbook"""
+    rows = (dict(product, category=category_name, extracted_at=timestamp) for product in products)
+    return write_products_excel(filename, rows) is not None
+
+def read_payload(source=None):
+    """Read a JSON payload from stdin ('-' or no argument), a file path or an inline JSON string"""
+    if source is None or source == '-':
+        return json.load(sys.stdin)
+    if os.path.isfile(source):
+        with open(source, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(source)
+
+def main():
+    """Command line entry point for scripts that still shell out"""
+    if len(sys.argv) < 3:
+        print("Usage: python file_writer.py <command> <filename> <args...>")
         sys.exit(1)
-    
+
     command = sys.argv[1]
-    
+    filename = sys.argv[2]
+
     if command == "json":
-        if len(sys.argv) < 3:
-            print("Usage: python file_writer.py json <filename> <json_data>")
-            sys.exit(1)
-        filename = sys.argv[2]
-        json_data = sys.argv[3]
-        data = json.loads(json_data)
-        write_json_file(filename, data)
-    
+        # Payload: inline JSON, a JSON file, or stdin when omitted / '-'
+        data = read_payload(sys.argv[3] if len(sys.argv) > 3 else None)
+        ok = write_json_file(filename, data)
+
     elif command == "csv":
         if len(sys.argv) < 6:
-            print("Usage: python file_writer.py csv <filename> <products_json> <category> <timestamp>")
+            print("Usage: python file_writer.py csv <filename> <products_json|products_file|-> <category> <timestamp>")
             sys.exit(1)
-        filename = sys.argv[2]
-        products_json = sys.argv[3]
+        products = read_payload(sys.argv[3])
         category = sys.argv[4]
         timestamp = sys.argv[5]
-        products = json.loads(products_json)
-        write_csv_file(filename, products, category, timestamp)
-    
+        ok = write_csv_file(filename, products, category, timestamp)
+
+    elif command == "xlsx":
+        if len(sys.argv) < 6:
+            print("Usage: python file_writer.py xlsx <filename> <products_json|products_file|-> <category> <timestamp>")
+            sys.exit(1)
+        ok = write_excel_file(filename, read_payload(sys.argv[3]), sys.argv[4], sys.argv[5])
+
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
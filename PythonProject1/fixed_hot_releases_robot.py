@@ -5,24 +5,35 @@ Handles blank page issues and provides better debugging
 """
 
 import json
-import csv
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import re
+from bulk_extractor import extract_products_in_browser
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from selector_stats import first_match
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click, scheduled_refresh
+from page_health import probe_page_health, print_page_health
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import ProductStreamWriter
+from excel_writer import write_products_excel
 
 class FixedHotNewReleasesExtractor:
-    def __init__(self, headless=False):
-        """Initialize the extractor with Chrome WebDriver"""
+    def __init__(self, headless=False, driver_pool=None):
+        """Initialize the extractor with Chrome WebDriver (borrowed from driver_pool when given)"""
         self.driver = None
         self.headless = headless
-        self.setup_driver()
+        self.driver_pool = driver_pool
+        if driver_pool:
+            self.driver = driver_pool.acquire()
+        else:
+            self.setup_driver()
     
     def setup_driver(self):
         """Setup Chrome WebDriver with options to prevent blank pages"""
@@ -47,7 +58,7 @@ class FixedHotNewReleasesExtractor:
         }
         chrome_options.add_experimental_option("prefs", prefs)
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         self.driver.maximize_window()
@@ -58,15 +69,14 @@ class FixedHotNewReleasesExtractor:
             print("Starting login process...")
             
             # Navigate to Amazon
-            self.driver.get("https://www.amazon.in/")
-            time.sleep(5)
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on Sign In
             sign_in_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[text()='Hello, sign in']"))
             )
-            sign_in_element.click()
-            time.sleep(3)
+            scheduled_click(self.driver, sign_in_element)
             
             # Enter email
             email_field = WebDriverWait(self.driver, 10).until(
@@ -74,12 +84,10 @@ class FixedHotNewReleasesExtractor:
             )
             email_field.clear()
             email_field.send_keys(email)
-            time.sleep(1)
             
             # Click Continue
             continue_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            continue_button.click()
-            time.sleep(3)
+            scheduled_click(self.driver, continue_button)
             
             # Enter password
             password_field = WebDriverWait(self.driver, 10).until(
@@ -87,12 +95,11 @@ class FixedHotNewReleasesExtractor:
             )
             password_field.clear()
             password_field.send_keys(password)
-            time.sleep(1)
             
             # Click Sign In
             sign_in_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            sign_in_button.click()
-            time.sleep(5)
+            scheduled_click(self.driver, sign_in_button)
+            wait_for_page_ready(self.driver)
             
             print("Login successful!")
             return True
@@ -107,8 +114,8 @@ class FixedHotNewReleasesExtractor:
             print("Navigating to Hot New Releases...")
             
             # Try direct navigation first
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            time.sleep(10)  # Increased wait time
+            scheduled_get(self.driver, "https://www.amazon.in/gp/new-releases/")
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Check if page loaded properly
             page_title = self.driver.title
@@ -125,20 +132,20 @@ class FixedHotNewReleasesExtractor:
             
             # Scroll to load content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(3)
+            wait_for_page_ready(self.driver)
             
-            # Check page source length
-            page_source = self.driver.page_source
-            print(f"Page source length: {len(page_source)}")
+            # Check page health
+            health = probe_page_health(self.driver)
+            print_page_health(health)
             
             # Take screenshot for debugging
             self.driver.save_screenshot("debug_new_releases_page.png")
             
             # If page seems blank, try refreshing
-            if len(page_source) < 10000:  # Arbitrary threshold
+            if health['html_length'] < 10000:  # Arbitrary threshold
                 print("Page seems blank, refreshing...")
-                self.driver.refresh()
-                time.sleep(10)
+                scheduled_refresh(self.driver)
+                wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             return True
             
@@ -172,15 +179,26 @@ class FixedHotNewReleasesExtractor:
             print(f"Error getting category name: {str(e)}")
             return "Hot New Releases - Unknown Category"
     
-    def extract_products(self, max_products=5):
+    def extract_products(self, max_products=5, bulk=True, on_product=None):
         """Extract product information with multiple strategies"""
         products = []
         
         try:
             print("Looking for product elements...")
             
-            # Wait for page to load
-            time.sleep(5)
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
+            
+            # Bulk mode: every product record in a single execute_script round trip
+            if bulk:
+                products = extract_products_in_browser(self.driver, max_products)
+                if products:
+                    if on_product:
+                        for product in products:
+                            on_product(product)
+                    print(f"\nSuccessfully extracted {len(products)} products")
+                    return products
+                print("Bulk extraction found no products, falling back to element-by-element extraction...")
             
             # Try multiple strategies to find products
             product_containers = []
@@ -212,7 +230,10 @@ class FixedHotNewReleasesExtractor:
             print(f"Total containers to process: {len(product_containers)}")
             
             # Extract products
-            for i, container in enumerate(product_containers[:max_products]):
+            seen_asins = set()
+            for i, container in enumerate(product_containers):
+                if len(products) >= max_products:
+                    break
                 try:
                     print(f"\n--- Processing Product {i+1} ---")
                     
@@ -225,17 +246,27 @@ class FixedHotNewReleasesExtractor:
                     # Extract rating
                     rating = self.get_product_rating(container)
                     
+                    # Extract the ASIN from the product's /dp/ link
+                    link = get_product_link(container)
+                    
                     product_data = {
                         'ranking': len(products) + 1,
+                        'asin': extract_asin(link),
                         'title': title,
                         'price': price,
                         'rating': rating,
+                        'link': link,
                         'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
                     
                     # Only add if we got meaningful data
-                    if title != "No Title Available" or price != "Price Not Available":
+                    if product_data['asin'] and product_data['asin'] in seen_asins:
+                        print(f"Skipping product {i+1} - duplicate of {product_data['asin']}")
+                    elif title != "No Title Available" or price != "Price Not Available":
+                        seen_asins.add(product_data['asin'])
                         products.append(product_data)
+                        if on_product:
+                            on_product(product_data)
                         print(f"Added product {len(products)}: {title[:50]}...")
                     else:
                         print(f"Skipping product {i+1} - no meaningful data")
@@ -262,14 +293,15 @@ class FixedHotNewReleasesExtractor:
             ".//a[contains(@class, 'a-link')]//span"
         ]
         
-        for selector in title_selectors:
-            try:
-                title_element = container.find_element(By.XPATH, selector)
-                title = title_element.text.strip()
+        def title_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                title = element.text.strip()
                 if title and len(title) > 5:
                     return title
-            except:
-                continue
+        
+        title = first_match('product_title', title_selectors, title_from)
+        if title:
+            return title
         
         return "No Title Available"
     
@@ -283,14 +315,15 @@ class FixedHotNewReleasesExtractor:
             ".//span[contains(text(), '$')]"
         ]
         
-        for selector in price_selectors:
-            try:
-                price_element = container.find_element(By.XPATH, selector)
-                price = price_element.text.strip()
+        def price_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                price = element.text.strip()
                 if price and ('₹' in price or '$' in price):
                     return price
-            except:
-                continue
+        
+        price = first_match('product_price', price_selectors, price_from)
+        if price:
+            return price
         
         return "Price Not Available"
     
@@ -304,14 +337,15 @@ class FixedHotNewReleasesExtractor:
             ".//span[contains(text(), 'stars')]"
         ]
         
-        for selector in rating_selectors:
-            try:
-                rating_element = container.find_element(By.XPATH, selector)
-                rating = rating_element.text.strip()
+        def rating_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                rating = element.text.strip()
                 if rating and ('out of' in rating or 'stars' in rating):
                     return rating
-            except:
-                continue
+        
+        rating = first_match('product_rating', rating_selectors, rating_from)
+        if rating:
+            return rating
         
         return "No Rating Available"
     
@@ -338,29 +372,6 @@ class FixedHotNewReleasesExtractor:
             print(f"Error saving to JSON: {str(e)}")
             return None
     
-    def save_to_csv(self, products, category_name):
-        """Save products to CSV file (Excel compatible)"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"hot_new_releases_{self.sanitize_filename(category_name)}_{timestamp}.csv"
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for product in products:
-                    product['category'] = category_name
-                    product['extracted_at'] = timestamp
-                    writer.writerow(product)
-            
-            print(f"Products saved to CSV file: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error saving to CSV: {str(e)}")
-            return None
-    
     def sanitize_filename(self, filename):
         """Sanitize filename by removing/replacing invalid characters"""
         return re.sub(r'[<>:"/\\|?*]', '_', filename).replace(' ', '_')
@@ -371,7 +382,7 @@ class FixedHotNewReleasesExtractor:
             print("Starting Fixed Hot New Releases extraction...")
             
             # Login to Amazon
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("Login failed!")
                 return False
             
@@ -383,8 +394,9 @@ class FixedHotNewReleasesExtractor:
             # Get category name
             category_name = self.get_category_name()
             
-            # Extract products
-            products = self.extract_products()
+            # Extract products, streaming each one to disk as it is found
+            with ProductStreamWriter(category_name) as stream:
+                products = self.extract_products(on_product=stream.write)
             
             if not products:
                 print("No products extracted!")
@@ -393,8 +405,14 @@ class FixedHotNewReleasesExtractor:
             # Save to JSON
             json_file = self.save_to_json(products, category_name)
             
-            # Save to CSV (Excel compatible)
-            csv_file = self.save_to_csv(products, category_name)
+            # The CSV was written row by row during extraction
+            csv_file = stream.csv_filename
+            
+            # Save a native Excel workbook with numeric price and rating cells
+            excel_file = write_products_excel(stream.basename + '.xlsx', products, category_name)
+            
+            # Append this run to the product history database
+            record_products(products, category_name)
             
             # Display results
             print("\n" + "="*50)
@@ -404,6 +422,8 @@ class FixedHotNewReleasesExtractor:
             print(f"Products extracted: {len(products)}")
             print(f"JSON file: {json_file}")
             print(f"CSV file: {csv_file}")
+            print(f"JSON Lines file: {stream.jsonl_filename}")
+            print(f"Excel file: {excel_file}")
             print("\nExtracted Products:")
             for product in products:
                 print(f"  {product['ranking']}. {product['title'][:60]}...")
@@ -416,8 +436,10 @@ class FixedHotNewReleasesExtractor:
             return False
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser, or hand it back to the driver pool"""
+        if self.driver and self.driver_pool:
+            self.driver_pool.release(self.driver)
+        elif self.driver:
             self.driver.quit()
 
 def main():
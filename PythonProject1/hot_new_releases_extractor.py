@@ -5,24 +5,33 @@ Extracts top 5 products from Amazon's Hot New Releases section with authenticati
 """
 
 import json
-import csv
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import re
+from bulk_extractor import extract_products_in_browser
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import ProductStreamWriter
+from excel_writer import write_products_excel
 
 class HotNewReleasesExtractor:
-    def __init__(self, headless=False):
-        """Initialize the extractor with Chrome WebDriver"""
+    def __init__(self, headless=False, driver_pool=None):
+        """Initialize the extractor with Chrome WebDriver (borrowed from driver_pool when given)"""
         self.driver = None
         self.headless = headless
-        self.setup_driver()
+        self.driver_pool = driver_pool
+        if driver_pool:
+            self.driver = driver_pool.acquire()
+        else:
+            self.setup_driver()
     
     def setup_driver(self):
         """Setup Chrome WebDriver with appropriate options"""
@@ -38,7 +47,7 @@ class HotNewReleasesExtractor:
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         self.driver.maximize_window()
@@ -49,15 +58,14 @@ class HotNewReleasesExtractor:
             print("Starting login process...")
             
             # Navigate to Amazon
-            self.driver.get("https://www.amazon.in/")
-            time.sleep(5)
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on Sign In
             sign_in_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[text()='Hello, sign in']"))
             )
-            sign_in_element.click()
-            time.sleep(3)
+            scheduled_click(self.driver, sign_in_element)
             
             # Enter email
             email_field = WebDriverWait(self.driver, 10).until(
@@ -65,12 +73,10 @@ class HotNewReleasesExtractor:
             )
             email_field.clear()
             email_field.send_keys(email)
-            time.sleep(1)
             
             # Click Continue
             continue_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            continue_button.click()
-            time.sleep(3)
+            scheduled_click(self.driver, continue_button)
             
             # Enter password
             password_field = WebDriverWait(self.driver, 10).until(
@@ -78,12 +84,11 @@ class HotNewReleasesExtractor:
             )
             password_field.clear()
             password_field.send_keys(password)
-            time.sleep(1)
             
             # Click Sign In
             sign_in_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            sign_in_button.click()
-            time.sleep(5)
+            scheduled_click(self.driver, sign_in_button)
+            wait_for_page_ready(self.driver)
             
             print("Login successful!")
             return True
@@ -98,8 +103,8 @@ class HotNewReleasesExtractor:
             print("Navigating to Hot New Releases...")
             
             # Try direct navigation first
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            time.sleep(8)
+            scheduled_get(self.driver, "https://www.amazon.in/gp/new-releases/")
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Check if we're on the right page
             current_url = self.driver.current_url
@@ -109,29 +114,27 @@ class HotNewReleasesExtractor:
             
             # If direct navigation didn't work, try through menu
             print("Direct navigation failed, trying through menu...")
-            self.driver.get("https://www.amazon.in/")
-            time.sleep(3)
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on category menu
             category_menu = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[@class='hm-icon-label'][1]"))
             )
             category_menu.click()
-            time.sleep(3)
             
             # Click on "All" category
             all_category = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//a[@class='hmenu-item' and contains(text(), 'All')]"))
             )
             all_category.click()
-            time.sleep(2)
             
             # Click on "New Releases"
             new_releases = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//a[@href='/gp/new-releases/?ref_=nav_em_cs_newreleases_0_1_1_3']"))
             )
-            new_releases.click()
-            time.sleep(5)
+            scheduled_click(self.driver, new_releases)
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             print("Successfully navigated to Hot New Releases section")
             return True
@@ -150,19 +153,30 @@ class HotNewReleasesExtractor:
         except:
             return "Hot New Releases - Unknown Category"
     
-    def extract_products(self, max_products=5):
+    def extract_products(self, max_products=5, bulk=True, on_product=None):
         """Extract product information from the page"""
         products = []
         
         try:
             print("Looking for product elements...")
             
-            # Wait for page to load
-            time.sleep(5)
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Scroll to load more content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(3)
+            wait_for_page_ready(self.driver)
+            
+            # Bulk mode: every product record in a single execute_script round trip
+            if bulk:
+                products = extract_products_in_browser(self.driver, max_products)
+                if products:
+                    if on_product:
+                        for product in products:
+                            on_product(product)
+                    print(f"\nSuccessfully extracted {len(products)} products")
+                    return products
+                print("Bulk extraction found no products, falling back to element-by-element extraction...")
             
             # Look for product containers
             product_containers = self.driver.find_elements(By.XPATH, "//div[@class='zg-item-immersion']")
@@ -174,7 +188,10 @@ class HotNewReleasesExtractor:
             print(f"Found {len(product_containers)} product containers")
             
             # Extract products
-            for i, container in enumerate(product_containers[:max_products]):
+            seen_asins = set()
+            for i, container in enumerate(product_containers):
+                if len(products) >= max_products:
+                    break
                 try:
                     print(f"\n--- Processing Product {i+1} ---")
                     
@@ -196,15 +213,27 @@ class HotNewReleasesExtractor:
                     except:
                         rating = "No Rating Available"
                     
+                    # Extract the ASIN from the product's /dp/ link
+                    link = get_product_link(container)
+                    asin = extract_asin(link)
+                    if asin and asin in seen_asins:
+                        print(f"Skipping product {i+1} - duplicate of {asin}")
+                        continue
+                    seen_asins.add(asin)
+                    
                     product_data = {
                         'ranking': len(products) + 1,
+                        'asin': asin,
                         'title': title,
                         'price': price,
                         'rating': rating,
+                        'link': link,
                         'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
                     
                     products.append(product_data)
+                    if on_product:
+                        on_product(product_data)
                     print(f"Extracted: {title[:50]}... | Price: {price} | Rating: {rating}")
                     
                 except Exception as e:
@@ -241,29 +270,6 @@ class HotNewReleasesExtractor:
             print(f"Error saving to JSON: {str(e)}")
             return None
     
-    def save_to_csv(self, products, category_name):
-        """Save products to CSV file (Excel compatible)"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"hot_new_releases_{self.sanitize_filename(category_name)}_{timestamp}.csv"
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for product in products:
-                    product['category'] = category_name
-                    product['extracted_at'] = timestamp
-                    writer.writerow(product)
-            
-            print(f"Products saved to CSV file: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error saving to CSV: {str(e)}")
-            return None
-    
     def sanitize_filename(self, filename):
         """Sanitize filename by removing/replacing invalid characters"""
         return re.sub(r'[<>:"/\\|?*]', '_', filename).replace(' ', '_')
@@ -274,7 +280,7 @@ class HotNewReleasesExtractor:
             print("Starting Hot New Releases extraction...")
             
             # Login to Amazon
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("Login failed!")
                 return False
             
@@ -286,8 +292,9 @@ class HotNewReleasesExtractor:
             # Get category name
             category_name = self.get_category_name()
             
-            # Extract products
-            products = self.extract_products()
+            # Extract products, streaming each one to disk as it is found
+            with ProductStreamWriter(category_name) as stream:
+                products = self.extract_products(on_product=stream.write)
             
             if not products:
                 print("No products extracted!")
@@ -296,8 +303,14 @@ class HotNewReleasesExtractor:
             # Save to JSON
             json_file = self.save_to_json(products, category_name)
             
-            # Save to CSV (Excel compatible)
-            csv_file = self.save_to_csv(products, category_name)
+            # The CSV was written row by row during extraction
+            csv_file = stream.csv_filename
+            
+            # Save a native Excel workbook with numeric price and rating cells
+            excel_file = write_products_excel(stream.basename + '.xlsx', products, category_name)
+            
+            # Append this run to the product history database
+            record_products(products, category_name)
             
             # Display results
             print("\n" + "="*50)
@@ -307,6 +320,8 @@ class HotNewReleasesExtractor:
             print(f"Products extracted: {len(products)}")
             print(f"JSON file: {json_file}")
             print(f"CSV file: {csv_file}")
+            print(f"JSON Lines file: {stream.jsonl_filename}")
+            print(f"Excel file: {excel_file}")
             print("\nExtracted Products:")
             for product in products:
                 print(f"  {product['ranking']}. {product['title'][:60]}...")
@@ -319,8 +334,10 @@ class HotNewReleasesExtractor:
             return False
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser, or hand it back to the driver pool"""
+        if self.driver and self.driver_pool:
+            self.driver_pool.release(self.driver)
+        elif self.driver:
             self.driver.quit()
 
 def main():
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+HTTP Fetch Backend
+Fetches Hot New Releases category pages over a pooled keep-alive HTTP session that reuses a browser login
+"""
+
+import json
+import re
+import sys
+import time
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+from offline_extractor import OfflineProductExtractor
+from request_scheduler import get_scheduler
+from response_cache import ResponseCache, cached_get
+from session_store import SessionStore
+
+NEW_RELEASES_URL = "https://www.amazon.in/gp/new-releases/"
+
+CATEGORY_LINK_XPATH = etree.XPath("//a[contains(@href, '/gp/new-releases/')]/@href")
+CATEGORY_PATH_PATTERN = re.compile(r'^(?:https://www\.amazon\.in)?(/gp/new-releases/[a-z0-9-]+)/?(?:[?#].*|/ref=.*)?$')
+
+try:
+    # urllib3 only decodes brotli responses when a brotli package is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+def create_pooled_session(pool_maxsize=8, retries=2):
+    """requests.Session with keep-alive connection pooling, retries and compressed responses"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504],
+                          allowed_methods=['GET', 'HEAD'])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(BROWSER_HEADERS)
+    return session
+
+class HttpFetcher:
+    """Fetches and parses category pages without a browser render"""
+
+    def __init__(self, pool_maxsize=8, timeout=15, cache=None, scheduler=None):
+        """cache is an optional response_cache.ResponseCache consulted before every request;
+        network requests are paced by scheduler (the process-wide one by default)"""
+        self.session = create_pooled_session(pool_maxsize)
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler or get_scheduler()
+        self.parser = OfflineProductExtractor()
+
+    def use_cookies(self, cookies):
+        """Load Selenium-style cookie dictionaries into the HTTP session"""
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        print(f"Loaded {len(cookies)} cookies into the HTTP session")
+
+    def use_browser_session(self, driver):
+        """Reuse a logged-in browser's cookies and user agent"""
+        self.use_cookies(driver.get_cookies())
+        self.session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+
+    def use_saved_session(self, store=None):
+        """Reuse the session saved by session_store - no browser needed. Returns False if there is none"""
+        session = (store or SessionStore()).load()
+        if not session:
+            return False
+        self.use_cookies(session['cookies'])
+        return True
+
+    def fetch(self, url):
+        """Return the raw HTML bytes of url, or None on failure"""
+        try:
+            started = time.perf_counter()
+            if self.cache:
+                status, body, source = cached_get(self.session, url, self.cache, self.timeout, self.scheduler)
+            else:
+                self.scheduler.wait(url)
+                response = self.session.get(url, timeout=self.timeout)
+                status, body, source = response.status_code, response.content, 'network'
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if status != 200:
+                print(f"HTTP {status} for {url}")
+                return None
+            print(f"Fetched {url} ({len(body)} bytes, {elapsed_ms:.0f} ms, {source})")
+            return body
+        except Exception as e:
+            print(f"Error fetching {url}: {str(e)}")
+            return None
+
+    def fetch_products(self, url, max_products=5):
+        """Fetch a category page and parse it offline - returns (products, category_name)"""
+        html = self.fetch(url)
+        if html is None:
+            return [], "Hot New Releases - Unknown Category"
+        return self.parser.extract_from_source(html, max_products)
+
+    def discover_category_urls(self, url=NEW_RELEASES_URL):
+        """Return absolute URLs of the category pages linked from the New Releases page"""
+        html = self.fetch(url)
+        if html is None:
+            return []
+        paths = []
+        for href in CATEGORY_LINK_XPATH(self.parser.parse(html)):
+            match = CATEGORY_PATH_PATTERN.match(href)
+            if match and match.group(1) not in paths:
+                paths.append(match.group(1))
+        return ['https://www.amazon.in' + path + '/' for path in paths]
+
+    def fetch_categories(self, urls, max_products=5):
+        """Yield (url, products, category_name) for every category page"""
+        for url in urls:
+            products, category_name = self.fetch_products(url, max_products)
+            yield url, products, category_name
+
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+
+def main():
+    """Fetch every New Releases category over HTTP using the saved login session"""
+    max_products = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fetcher = HttpFetcher(cache=ResponseCache())
+    if not fetcher.use_saved_session():
+        print("No saved session - run an extractor once to log in, fetching logged out")
+
+    started = time.perf_counter()
+    results = []
+    try:
+        urls = fetcher.discover_category_urls()
+        print(f"Found {len(urls)} category pages")
+        for url, products, category_name in fetcher.fetch_categories(urls, max_products):
+            print(f"{category_name}: {len(products)} products")
+            results.append({'url': url, 'category': category_name, 'products': products})
+    finally:
+        fetcher.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Fetched and parsed {len(results)} categories in {elapsed:.2f}s")
+    fetcher.scheduler.print_stats()
+    filename = f"hot_new_releases_http_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Results saved to {filename}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Page Layout Fingerprint
+Identifies which Amazon layout a page uses from counts of key structural markers and remembers the selectors that work on it
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from file_lock import locked_file
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.layout_profiles.json')
+
+# Structural markers that tell the Amazon list layouts apart, as (name, xpath)
+LAYOUT_MARKERS = [
+    ('zg-item-immersion', "//div[@class='zg-item-immersion']"),
+    ('zg-item', "//div[contains(@class, 'zg-item')]"),
+    ('grid-item-root', "//*[@id='gridItemRoot']"),
+    ('p13n-faceout', "//div[contains(@class, 'p13n-sc-uncoverable-faceout')]"),
+    ('carousel-card', "//li[contains(@class, 'a-carousel-card')]"),
+    ('search-result', "//div[@data-component-type='s-search-result']"),
+    ('item-div', "//div[contains(@class, 'item')]"),
+    ('product-div', "//div[contains(@class, 'product')]"),
+    ('dp-link', "//a[contains(@href, '/dp/')]"),
+    ('a-price', "//span[contains(@class, 'a-price')]"),
+    ('a-icon-alt', "//span[contains(@class, 'a-icon-alt')]"),
+    ('zg-badge', "//span[contains(@class, 'zg-bdg-text')]")
+]
+
+# Counts are bucketed so a page with 48 instead of 50 products keeps its fingerprint
+COUNT_BUCKETS = [0, 1, 5, 20, 100]
+
+PROFILE_FIELDS = ['container', 'title', 'price', 'rating']
+
+# Marker counting and the layout signature in the browser, shared with the
+# bulk extraction script so it can fingerprint the page in its own call
+LAYOUT_JS_FUNCTIONS = r"""
+function countMarkers(markers) {
+    var counts = {};
+    for (var i = 0; i < markers.length; i++) {
+        try {
+            counts[markers[i][0]] = document.evaluate('count(' + markers[i][1] + ')', document, null,
+                                                      XPathResult.NUMBER_TYPE, null).numberValue;
+        } catch (e) {
+            counts[markers[i][0]] = 0;
+        }
+    }
+    return counts;
+}
+
+function layoutSignature(counts, markers, buckets) {
+    var parts = [];
+    for (var i = 0; i < markers.length; i++) {
+        var bucket = 0;
+        for (var j = 0; j < buckets.length; j++) {
+            if ((counts[markers[i][0]] || 0) >= buckets[j]) {
+                bucket = j;
+            }
+        }
+        parts.push(markers[i][0] + ':' + bucket);
+    }
+    return parts.join(';');
+}
+"""
+
+# Counts every marker in one call
+LAYOUT_COUNTS_JS = LAYOUT_JS_FUNCTIONS + "return countMarkers(arguments[0]);"
+
+def count_bucket(count):
+    """Index of the COUNT_BUCKETS range count falls into"""
+    return max(index for index, floor in enumerate(COUNT_BUCKETS) if count >= floor)
+
+def layout_signature(counts):
+    """Bucketed marker counts as text - layoutSignature in LAYOUT_JS_FUNCTIONS gives the same string"""
+    return ';'.join(f"{name}:{count_bucket(counts.get(name, 0))}" for name, _ in LAYOUT_MARKERS)
+
+def fingerprint_from_counts(counts):
+    """Short stable hash of the bucketed marker counts"""
+    return hashlib.sha1(layout_signature(counts).encode('utf-8')).hexdigest()[:12]
+
+def probe_layout(driver):
+    """{'fingerprint', 'counts'} for the page in the browser, or None if it cannot be measured"""
+    try:
+        counts = driver.execute_script(LAYOUT_COUNTS_JS, [list(marker) for marker in LAYOUT_MARKERS])
+        counts = {name: int(count) for name, count in counts.items()}
+        return {'fingerprint': fingerprint_from_counts(counts), 'counts': counts}
+    except Exception as e:
+        print(f"Error fingerprinting page layout: {str(e)}")
+        return None
+
+def layout_of_tree(root):
+    """{'fingerprint', 'counts'} for a parsed lxml tree - the same fingerprint the browser probe gives"""
+    counts = {name: int(root.xpath(f"count({xpath})")) for name, xpath in LAYOUT_MARKERS}
+    return {'fingerprint': fingerprint_from_counts(counts), 'counts': counts}
+
+def preferred_first(candidates, preferred):
+    """candidates with preferred moved to the front (added if it is not one of them)"""
+    if not preferred:
+        return list(candidates)
+    return [preferred] + [candidate for candidate in candidates if candidate != preferred]
+
+class LayoutRegistry:
+    """Known layout fingerprints and the container/title/price/rating selectors that worked on each
+
+    Saving re-reads the file under a lock and applies only this process's
+    learned and forgotten profiles, so concurrent workers keep each
+    other's updates.
+    """
+
+    def __init__(self, filename=REGISTRY_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.changes = {}
+        self.profiles = self.load()
+
+    def load(self):
+        """Read the registry file - {} if missing or unreadable"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, fingerprint):
+        """Extraction profile for fingerprint, or None for an unknown layout"""
+        return self.profiles.get(fingerprint)
+
+    def profiles_by_signature(self):
+        """{layout signature: selectors} for every profile, for lookups made inside the browser"""
+        with self.lock:
+            return {layout_signature(profile['counts']): {field: profile.get(field) for field in PROFILE_FIELDS}
+                    for profile in self.profiles.values() if profile.get('counts')}
+
+    def learn(self, fingerprint, counts, selectors):
+        """Store the selectors that extracted products from a layout; returns True if the profile changed"""
+        profile = {field: selectors.get(field) for field in PROFILE_FIELDS}
+        with self.lock:
+            known = self.profiles.get(fingerprint)
+            if known and all(known.get(field) == profile[field] for field in PROFILE_FIELDS):
+                return False
+            profile['counts'] = counts
+            profile['learned_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self.profiles[fingerprint] = profile
+            self.changes[fingerprint] = profile
+            self.save()
+        print(f"Learned layout profile {fingerprint}: {profile['container']}")
+        return True
+
+    def forget(self, fingerprint):
+        """Drop a profile whose selectors stopped working"""
+        with self.lock:
+            if self.profiles.pop(fingerprint, None) is None:
+                return
+            self.changes[fingerprint] = None
+            self.save()
+        print(f"Forgot layout profile {fingerprint}")
+
+    def save(self):
+        """Merge this process's changes into the registry file and replace it atomically"""
+        try:
+            with locked_file(self.filename):
+                profiles = self.load()
+                for fingerprint, profile in self.changes.items():
+                    if profile is None:
+                        profiles.pop(fingerprint, None)
+                    else:
+                        profiles[fingerprint] = profile
+                with open(self.filename + '.part', 'w', encoding='utf-8') as f:
+                    json.dump(profiles, f, indent=2)
+                os.replace(self.filename + '.part', self.filename)
+            self.profiles = profiles
+            self.changes = {}
+        except (OSError, TimeoutError) as e:
+            print(f"Could not save layout profiles: {str(e)}")
+
+# Process-wide registry
+_registry = None
+
+def get_layout_registry():
+    """The process-wide LayoutRegistry"""
+    global _registry
+    if _registry is None:
+        _registry = LayoutRegistry()
+    return _registry
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from lxml import etree
+        for filename in sys.argv[1:]:
+            layout = layout_of_tree(etree.parse(filename, etree.HTMLParser(encoding='utf-8')).getroot())
+            profile = get_layout_registry().get(layout['fingerprint'])
+            print(f"{filename}: {layout['fingerprint']} ({'known' if profile else 'unknown'} layout) {layout['counts']}")
+    else:
+        print(json.dumps(get_layout_registry().profiles, indent=2))
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Offline Product Extractor
+Re-extracts Hot New Releases products from a page_source string or saved HTML file with lxml
+"""
+
+import json
+import re
+import sys
+import time
+from datetime import datetime
+from lxml import etree
+from layout_fingerprint import get_layout_registry, layout_of_tree
+from product_fields import extract_asin
+from pageobjects.locators import HotNewRelease as locators
+
+RANK_PATTERN = re.compile(r'#\s*(\d+)')
+
+
+def compile_alternatives(locator):
+    """Pre-compile each '|' alternative of a locator so they can be tried in order"""
+    return [etree.XPath(part.strip()) for part in locator.split(' | ')]
+
+
+def node_text(node):
+    """Whitespace-normalized text content of an element"""
+    return ' '.join(' '.join(node.itertext()).split())
+
+
+class OfflineProductExtractor:
+    def __init__(self):
+        """Compile the HotNewRelease.py locators once for every page this instance parses"""
+        self.parser = etree.HTMLParser(encoding='utf-8')
+        self.category_xpaths = compile_alternatives(locators.hot_new_releases_title)
+        self.container_xpaths = compile_alternatives(locators.product_container)
+        self.title_xpaths = compile_alternatives(locators.product_title) + compile_alternatives(locators.product_title_alt)
+        self.price_xpaths = compile_alternatives(locators.product_price) + compile_alternatives(locators.product_price_alt)
+        self.rating_xpaths = compile_alternatives(locators.product_rating) + compile_alternatives(locators.product_rating_alt)
+        self.rank_xpaths = compile_alternatives(locators.product_rank)
+        self.link_xpath = etree.XPath(".//a[contains(@href, '/dp/')]/@href")
+        self.layouts = get_layout_registry()
+        self.profile_xpaths = {}
+
+    def parse(self, page_source):
+        """Parse a page_source string into an lxml tree"""
+        if isinstance(page_source, str):
+            page_source = page_source.encode('utf-8')
+        return etree.fromstring(page_source, self.parser)
+
+    def first_text(self, node, xpaths, accept):
+        """Return the first matching text that passes the accept check"""
+        for xpath in xpaths:
+            for match in xpath(node):
+                text = node_text(match)
+                if accept(text):
+                    return text
+        return None
+
+    def get_category_name(self, root):
+        """Get the Hot New Releases category heading from the parsed page"""
+        text = self.first_text(root, self.category_xpaths, lambda t: 'Hot New Releases' in t)
+        return text or "Hot New Releases - Unknown Category"
+
+    def with_profile(self, profile, field, xpaths):
+        """xpaths with the layout profile's selector for field compiled and tried first"""
+        selector = profile.get(field) if profile else None
+        if not selector:
+            return xpaths
+        if selector not in self.profile_xpaths:
+            self.profile_xpaths[selector] = etree.XPath(selector)
+        return [self.profile_xpaths[selector]] + xpaths
+
+    def find_containers(self, root, profile=None):
+        """Return product containers from the first locator alternative that matches"""
+        for xpath in self.with_profile(profile, 'container', self.container_xpaths):
+            containers = xpath(root)
+            if containers:
+                return containers
+        return []
+
+    def extract_from_tree(self, root, max_products=5):
+        """Extract products and the category name from a parsed tree"""
+        products = []
+        if root is None:
+            return products, "Hot New Releases - Unknown Category"
+
+        # Selectors the browser learned for this layout go first
+        profile = self.layouts.get(layout_of_tree(root)['fingerprint'])
+        title_xpaths = self.with_profile(profile, 'title', self.title_xpaths)
+        price_xpaths = self.with_profile(profile, 'price', self.price_xpaths)
+        rating_xpaths = self.with_profile(profile, 'rating', self.rating_xpaths)
+
+        extracted_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        seen_asins = set()
+        for container in self.find_containers(root, profile):
+            if max_products and len(products) >= max_products:
+                break
+
+            title = self.first_text(container, title_xpaths, lambda t: len(t) > 5)
+            price = self.first_text(container, price_xpaths, lambda t: '₹' in t or '$' in t)
+            rating = self.first_text(container, rating_xpaths, lambda t: 'out of' in t or 'stars' in t)
+            rank = self.first_text(container, self.rank_xpaths, lambda t: RANK_PATTERN.search(t) is not None)
+            if not title and not price:
+                continue
+
+            links = self.link_xpath(container)
+            if not links and container.tag == 'a' and '/dp/' in container.get('href', ''):
+                links = [container.get('href')]
+
+            # Nested or repeated containers of one product share its ASIN
+            asin = extract_asin(links[0]) if links else None
+            if asin and asin in seen_asins:
+                continue
+            seen_asins.add(asin)
+
+            products.append({
+                'ranking': len(products) + 1,
+                'asin': asin,
+                'title': title or "No Title Available",
+                'price': price or "Price Not Available",
+                'rating': rating or "No Rating Available",
+                'rank': int(RANK_PATTERN.search(rank).group(1)) if rank else None,
+                'link': links[0] if links else None,
+                'extracted_at': extracted_at
+            })
+
+        return products, self.get_category_name(root)
+
+    def extract_from_source(self, page_source, max_products=5):
+        """Extract products from a page_source string"""
+        try:
+            return self.extract_from_tree(self.parse(page_source), max_products)
+        except Exception as e:
+            print(f"Error extracting from page source: {str(e)}")
+            return [], "Hot New Releases - Unknown Category"
+
+    def extract_from_snapshot(self, snapshot, max_products=5):
+        """Extract products from a page_snapshot.PageSnapshot, reusing its parsed tree"""
+        try:
+            return self.extract_from_tree(snapshot.tree, max_products)
+        except Exception as e:
+            print(f"Error extracting from page snapshot: {str(e)}")
+            return [], "Hot New Releases - Unknown Category"
+
+    def extract_from_file(self, filename, max_products=5):
+        """Extract products from a saved HTML file (e.g. from capture_page_source)"""
+        try:
+            return self.extract_from_tree(etree.parse(filename, self.parser).getroot(), max_products)
+        except Exception as e:
+            print(f"Error extracting from {filename}: {str(e)}")
+            return [], "Hot New Releases - Unknown Category"
+
+    def extract_from_files(self, filenames, max_products=5):
+        """Yield (filename, products, category_name) for each saved HTML file"""
+        for filename in filenames:
+            products, category_name = self.extract_from_file(filename, max_products)
+            yield filename, products, category_name
+
+
+def main():
+    """Re-extract products from saved HTML files given on the command line"""
+    if len(sys.argv) < 2:
+        print("Usage: python offline_extractor.py <page.html> [<page.html> ...]")
+        sys.exit(1)
+
+    extractor = OfflineProductExtractor()
+    results = []
+    started = time.perf_counter()
+
+    for filename, products, category_name in extractor.extract_from_files(sys.argv[1:]):
+        print(f"{filename}: {category_name} - {len(products)} products")
+        results.append({'file': filename, 'category': category_name, 'products': products})
+
+    elapsed = time.perf_counter() - started
+    if elapsed > 0:
+        print(f"Parsed {len(results)} pages in {elapsed:.3f}s ({len(results) / elapsed * 60:.0f} pages/minute)")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
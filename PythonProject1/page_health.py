@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Page Health Probe
+Checks whether the current page is blank or missing expected content with one small script call
+"""
+
+# Text that shows the Hot New Releases page (or a usable fallback) has loaded
+NEW_RELEASES_MARKERS = ["Hot New Releases", "New Releases"]
+
+# Measures the page inside the browser and returns only the numbers, so the
+# check does not serialize the whole page_source over the WebDriver wire
+PAGE_HEALTH_JS = r"""
+var markers = arguments[0] || [];
+var root = document.documentElement;
+var html = root ? root.outerHTML : '';
+var body = document.body;
+var found = {};
+for (var i = 0; i < markers.length; i++) {
+    found[markers[i]] = html.indexOf(markers[i]) !== -1;
+}
+return {
+    element_count: document.getElementsByTagName('*').length,
+    text_length: body ? (body.innerText || '').length : 0,
+    html_length: html.length,
+    title: document.title,
+    url: location.href,
+    ready_state: document.readyState,
+    markers: found
+};
+"""
+
+
+def probe_page_health(driver, markers=NEW_RELEASES_MARKERS):
+    """Return element count, text/html length, title, url and marker presence for the current page
+
+    html_length matches len(driver.page_source), so existing blank-page
+    thresholds keep working. On failure every count is zero and no marker
+    is found, which callers treat as a blank page.
+    """
+    try:
+        health = driver.execute_script(PAGE_HEALTH_JS, list(markers))
+        if health:
+            return health
+    except Exception as e:
+        print(f"Error probing page health: {str(e)}")
+
+    return {
+        'element_count': 0,
+        'text_length': 0,
+        'html_length': 0,
+        'title': '',
+        'url': '',
+        'ready_state': 'unknown',
+        'markers': {marker: False for marker in markers}
+    }
+
+
+def has_marker(health):
+    """True if any of the probed markers was found on the page"""
+    return any(health['markers'].values())
+
+
+def print_page_health(health):
+    """Print a one-line summary of a probe result"""
+    print(f"Page health: {health['element_count']} elements, {health['text_length']} text chars, "
+          f"{health['html_length']} html chars, title '{health['title']}'")
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Page Snapshot
+Captures the current page's source, title and URL once per page version so every consumer in a run shares one copy
+"""
+
+import threading
+import weakref
+from lxml import etree
+from pageobjects.locators import HotNewRelease as locators
+
+# Changes on every navigation or refresh (new timeOrigin), URL change and
+# whenever elements are added or removed, e.g. lazy content loaded by a scroll
+PAGE_VERSION_JS = r"""
+return performance.timeOrigin + ' ' + location.href + ' ' + document.getElementsByTagName('*').length;
+"""
+
+SNAPSHOT_JS = r"""
+var doctype = document.doctype ? '<!DOCTYPE ' + document.doctype.name + '>' : '';
+return {
+    source: doctype + document.documentElement.outerHTML,
+    title: document.title,
+    url: location.href,
+    ready_state: document.readyState,
+    version: performance.timeOrigin + ' ' + location.href + ' ' + document.getElementsByTagName('*').length
+};
+"""
+
+# Whole-grid roots first, then the individual product containers
+GRID_ROOT_XPATHS = [
+    "//div[contains(@class, 'zg-grid')]",
+    "//*[@id='gridItemRoot']"
+] + [part.strip() for part in locators.product_container.split(' | ')]
+
+CATEGORY_HEADING_XPATHS = [
+    locators.hot_new_releases_title,
+    "//h1[contains(text(), 'Hot New Releases')]"
+]
+
+# Builds a minimal document out of the category headings and the outermost
+# product grid roots, so only the markup offline parsing needs crosses the
+# WebDriver wire. Falls back to the whole document when no grid is found.
+GRID_SNAPSHOT_JS = r"""
+var rootXpaths = arguments[0];
+var headingXpaths = arguments[1];
+
+function matches(xpath) {
+    var nodes = [];
+    try {
+        var result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+    } catch (e) {}
+    return nodes;
+}
+
+function outermost(nodes) {
+    var set = new Set(nodes);
+    return nodes.filter(function (node) {
+        for (var parent = node.parentNode; parent; parent = parent.parentNode) {
+            if (set.has(parent)) {
+                return false;
+            }
+        }
+        return true;
+    });
+}
+
+function utf8Length(text) {
+    return new TextEncoder().encode(text).length;
+}
+
+var doctype = document.doctype ? '<!DOCTYPE ' + document.doctype.name + '>' : '';
+var full = doctype + document.documentElement.outerHTML;
+
+var roots = [];
+var rootXpath = null;
+for (var i = 0; i < rootXpaths.length && !roots.length; i++) {
+    roots = outermost(matches(rootXpaths[i]));
+    rootXpath = rootXpaths[i];
+}
+
+var source = full;
+if (roots.length) {
+    var headings = [];
+    for (var j = 0; j < headingXpaths.length; j++) {
+        headings = headings.concat(matches(headingXpaths[j]));
+    }
+    headings = outermost(headings).filter(function (heading) {
+        return !roots.some(function (root) { return root.contains(heading); });
+    });
+    var title = document.createElement('title');
+    title.textContent = document.title;
+    source = '<!DOCTYPE html><html><head>' + title.outerHTML + '</head><body>' +
+        headings.map(function (node) { return node.outerHTML; }).join('') +
+        roots.map(function (node) { return node.outerHTML; }).join('') + '</body></html>';
+}
+
+return {
+    source: source,
+    title: document.title,
+    url: location.href,
+    ready_state: document.readyState,
+    version: performance.timeOrigin + ' ' + location.href + ' ' + document.getElementsByTagName('*').length,
+    scope: roots.length ? 'grid' : 'page',
+    root_xpath: roots.length ? rootXpath : null,
+    roots: roots.length,
+    full_bytes: utf8Length(full),
+    captured_bytes: utf8Length(source)
+};
+"""
+
+
+class PageSnapshot:
+    """One capture of a page: source, title, url and an lxml tree parsed on first use
+
+    scope is 'page' for the whole document or 'grid' for a product-grid-only
+    capture, whose full_bytes and captured_bytes record what was saved.
+    """
+
+    def __init__(self, source, title='', url='', ready_state='complete', version=None, scope='page',
+                 full_bytes=None, captured_bytes=None):
+        self.source = source
+        self.title = title
+        self.url = url
+        self.ready_state = ready_state
+        self.version = version
+        self.scope = scope
+        self.captured_bytes = captured_bytes if captured_bytes is not None else len(source.encode('utf-8'))
+        self.full_bytes = full_bytes if full_bytes is not None else self.captured_bytes
+        self._tree = None
+
+    @property
+    def bytes_saved(self):
+        """UTF-8 bytes not transferred compared with the whole document"""
+        return self.full_bytes - self.captured_bytes
+
+    @property
+    def tree(self):
+        """lxml tree of the source, parsed the first time it is needed"""
+        if self._tree is None:
+            parser = etree.HTMLParser(encoding='utf-8')
+            self._tree = etree.fromstring(self.source.encode('utf-8'), parser) if self.source else None
+            if self._tree is None:
+                self._tree = etree.Element('html')
+        return self._tree
+
+    def contains(self, text):
+        """True if text appears anywhere in the source"""
+        return text in self.source
+
+    def xpath(self, expression):
+        """Run an XPath expression against the parsed tree"""
+        return self.tree.xpath(expression)
+
+    def count(self, expression):
+        """Number of nodes matching an XPath expression"""
+        return int(self.tree.xpath(f"count({expression})"))
+
+    def save(self, filename):
+        """Write the source to filename"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.source)
+
+
+# Latest snapshot per driver and scope; drivers are not kept alive by it
+_snapshots = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+# One entry per grid capture: url, full_bytes, captured_bytes, bytes_saved
+_grid_captures = []
+
+
+def capture_snapshot(driver):
+    """Take a new PageSnapshot of the current page in one script call, or None on failure"""
+    try:
+        data = driver.execute_script(SNAPSHOT_JS)
+        return PageSnapshot(data['source'], data['title'], data['url'], data['ready_state'], data['version'])
+    except Exception as e:
+        print(f"Error capturing page snapshot: {str(e)}")
+        return None
+
+
+def capture_product_grid(driver):
+    """Take a PageSnapshot of only the category headings and product grid, or None on failure
+
+    When no grid is found the whole document is captured (scope 'page').
+    Every capture is recorded for grid_capture_stats.
+    """
+    try:
+        data = driver.execute_script(GRID_SNAPSHOT_JS, GRID_ROOT_XPATHS, CATEGORY_HEADING_XPATHS)
+    except Exception as e:
+        print(f"Error capturing product grid: {str(e)}")
+        return None
+
+    snapshot = PageSnapshot(data['source'], data['title'], data['url'], data['ready_state'], data['version'],
+                            data['scope'], data['full_bytes'], data['captured_bytes'])
+    with _lock:
+        _grid_captures.append({'url': snapshot.url, 'full_bytes': snapshot.full_bytes,
+                               'captured_bytes': snapshot.captured_bytes, 'bytes_saved': snapshot.bytes_saved})
+    if snapshot.scope == 'grid':
+        print(f"Captured {data['roots']} grid roots ({data['root_xpath']}): {snapshot.captured_bytes} of "
+              f"{snapshot.full_bytes} bytes, {snapshot.bytes_saved} saved")
+    else:
+        print(f"No product grid found - captured the whole page ({snapshot.full_bytes} bytes)")
+    return snapshot
+
+
+def grid_capture_stats():
+    """Per-page grid capture records and their totals"""
+    with _lock:
+        pages = list(_grid_captures)
+    full_bytes = sum(page['full_bytes'] for page in pages)
+    captured_bytes = sum(page['captured_bytes'] for page in pages)
+    return {
+        'pages': pages,
+        'full_bytes': full_bytes,
+        'captured_bytes': captured_bytes,
+        'bytes_saved': full_bytes - captured_bytes,
+        'ratio': round(full_bytes / captured_bytes, 1) if captured_bytes else 0.0
+    }
+
+
+def page_snapshot(driver, refresh=False, scope='page'):
+    """Snapshot of the driver's current page, shared until the page changes
+
+    scope='grid' captures only the category headings and product grid (see
+    capture_product_grid). A cheap version check decides whether the cached
+    snapshot still matches the page; a navigation, refresh, tab switch or
+    lazy-loaded content makes the next call capture a new one. Returns None
+    if the page cannot be read.
+    """
+    with _lock:
+        snapshot = None if refresh else _snapshots.get(driver, {}).get(scope)
+    if snapshot is not None:
+        try:
+            if driver.execute_script(PAGE_VERSION_JS) == snapshot.version:
+                return snapshot
+        except Exception:
+            pass
+
+    snapshot = capture_product_grid(driver) if scope == 'grid' else capture_snapshot(driver)
+    with _lock:
+        if snapshot is not None:
+            _snapshots.setdefault(driver, {})[scope] = snapshot
+        else:
+            _snapshots.get(driver, {}).pop(scope, None)
+    return snapshot
+
+
+def invalidate_snapshot(driver):
+    """Drop the driver's cached snapshots so the next page_snapshot call captures a new one"""
+    with _lock:
+        _snapshots.pop(driver, None)
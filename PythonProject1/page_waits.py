@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Page Readiness Waits
+Event-driven waits that resolve as soon as the page is loaded and the DOM has stopped changing
+"""
+
+import time
+from selenium.common.exceptions import WebDriverException
+
+# Present once the Hot New Releases product grid has rendered
+PRODUCT_GRID_XPATH = "//div[contains(@class, 'zg-item')] | //div[contains(@class, 'zg-grid')] | //a[contains(@href, '/dp/')]"
+
+# Resolves when document.readyState is complete, the ready element (if any)
+# exists and no nodes have been added/removed for quietMs - or on timeout
+DOM_SETTLED_JS = r"""
+var readyXpath = arguments[0];
+var quietMs = arguments[1];
+var timeoutMs = arguments[2];
+var callback = arguments[arguments.length - 1];
+var started = performance.now();
+var lastMutation = started;
+var finished = false;
+var timer = null;
+
+var observer = new MutationObserver(function () {
+    lastMutation = performance.now();
+});
+
+function readyElementPresent() {
+    if (!readyXpath) {
+        return true;
+    }
+    try {
+        return document.evaluate(readyXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+    } catch (e) {
+        return false;
+    }
+}
+
+function finish(ready, reason) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearInterval(timer);
+    callback({ready: ready, reason: reason, elapsed_ms: performance.now() - started});
+}
+
+function check() {
+    var now = performance.now();
+    var loaded = document.readyState === 'complete';
+    var present = readyElementPresent();
+    if (loaded && present && now - lastMutation >= quietMs) {
+        finish(true, 'settled');
+    } else if (now - started >= timeoutMs) {
+        finish(false, !loaded ? 'readyState ' + document.readyState : (!present ? 'ready element missing' : 'DOM still changing'));
+    }
+}
+
+observer.observe(document.documentElement || document, {childList: true, subtree: true, characterData: true});
+timer = setInterval(check, 50);
+check();
+"""
+
+
+def wait_for_page_ready(driver, ready_xpath=None, quiet_ms=500, timeout=15):
+    """Wait until the page is loaded, ready_xpath is present and the DOM is quiet
+
+    Returns the measured wait in seconds. Never raises - on timeout it reports
+    why the page was not ready and returns so the caller can inspect the page.
+    A navigation that unloads the document mid-wait is retried on the new page.
+    """
+    started = time.perf_counter()
+    deadline = started + timeout
+
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            print(f"Page not ready after {timeout}s: navigation still in progress")
+            break
+        try:
+            driver.set_script_timeout(remaining + 5)
+            result = driver.execute_async_script(DOM_SETTLED_JS, ready_xpath, quiet_ms, int(remaining * 1000))
+            if result and not result['ready']:
+                print(f"Page not ready after {timeout}s: {result['reason']}")
+            break
+        except WebDriverException:
+            # Document was replaced while waiting (e.g. after a form submit)
+            time.sleep(0.1)
+
+    elapsed = time.perf_counter() - started
+    print(f"Waited {elapsed:.2f}s for page readiness")
+    return elapsed
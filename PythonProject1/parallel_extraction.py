@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Parallel Multi-Category Extraction
+Extracts several Hot New Releases categories at once across worker processes and merges the results
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import util
+from selenium.webdriver.common.by import By
+from bulk_extractor import extract_products_in_browser
+from driver_pool import create_chrome_driver
+from excel_writer import write_products_excel
+from file_writer import write_json_file
+from page_waits import wait_for_page_ready
+from request_scheduler import scheduled_get
+from session_store import SessionStore, ensure_logged_in
+from stream_writer import CSV_FIELDS
+from product_history import record_products
+from pageobjects.locators import HotNewRelease as locators
+
+NEW_RELEASES_URL = "https://www.amazon.in/gp/new-releases/"
+
+SECTION_LOCATORS = [
+    locators.Section_firstTitle,
+    locators.Section_secondTitle,
+    locators.Section_thirdTitle,
+    locators.Section_fourTitle,
+    locators.Section_fiveTitle,
+    locators.Section_sixTitle
+]
+
+CATEGORY_PATTERN = re.compile(r"text\(\)='(Hot New Releases in [^']+)'")
+
+def section_categories():
+    """Return {category name: heading xpath} for the Section_* locators in HotNewRelease.py"""
+    return {CATEGORY_PATTERN.search(xpath).group(1): xpath for xpath in SECTION_LOCATORS}
+
+def section_root_xpath(heading_xpath):
+    """XPath of the closest block around a section heading that contains its products"""
+    return f"({heading_xpath})[1]/ancestor::div[.//a[contains(@href, '/dp/')]][1]"
+
+class SharedRateLimiter:
+    """Spaces out page loads across all worker processes to a global requests-per-minute budget"""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0
+        self.next_slot = multiprocessing.Value('d', 0.0)
+
+    def wait(self):
+        """Block until this process may make its next request"""
+        if not self.interval:
+            return
+        with self.next_slot.get_lock():
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# Per-worker-process state, set up by init_worker
+_worker = {}
+
+def init_worker(rate_limiter, headless, session_file):
+    """Worker process initializer - the browser itself is launched on the first task"""
+    _worker['rate_limiter'] = rate_limiter
+    _worker['headless'] = headless
+    _worker['session_file'] = session_file
+    _worker['driver'] = None
+
+def worker_driver():
+    """This worker's browser, logged in through the shared session"""
+    if _worker['driver'] is None:
+        driver = create_chrome_driver(_worker['headless'])
+        # Quit the browser when the worker process exits
+        util.Finalize(None, driver.quit, exitpriority=10)
+        _worker['rate_limiter'].wait()
+        if not SessionStore(_worker['session_file']).restore(driver):
+            print(f"Worker {os.getpid()}: shared session could not be restored, extracting logged out")
+        _worker['driver'] = driver
+    return _worker['driver']
+
+def extract_category(category_name, heading_xpath, max_products=5):
+    """Extract one category section in this worker's browser"""
+    started = time.perf_counter()
+    result = {'category': category_name, 'products': [], 'error': None}
+    try:
+        driver = worker_driver()
+        # The shared limiter spaces the workers out; scheduled_get adds the per-host budget
+        _worker['rate_limiter'].wait()
+        scheduled_get(driver, NEW_RELEASES_URL)
+        wait_for_page_ready(driver, heading_xpath)
+
+        headings = driver.find_elements(By.XPATH, heading_xpath)
+        if not headings:
+            result['error'] = "Section not found on page"
+            return result
+
+        # Carousels load their products once they scroll into view
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", headings[0])
+        wait_for_page_ready(driver)
+
+        products = extract_products_in_browser(driver, max_products, section_root_xpath(heading_xpath))
+        for product in products:
+            product['category'] = category_name
+        result['products'] = products
+
+        # Workers write their own runs; SQLite WAL serializes them safely
+        record_products(products, category_name)
+
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        result['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+def prepare_shared_session(email, password, headless=True, session_file=None):
+    """Make sure a valid saved session exists before the workers start, logging in once if needed"""
+    from hot_new_releases_extractor import HotNewReleasesExtractor
+
+    store = SessionStore(session_file) if session_file else SessionStore()
+    extractor = HotNewReleasesExtractor(headless=headless)
+    try:
+        return ensure_logged_in(extractor.driver, lambda: extractor.login_to_amazon(email, password), store)
+    finally:
+        extractor.close()
+
+def run_parallel_extraction(categories=None, max_workers=3, max_products=5, requests_per_minute=30,
+                            headless=True, session_file=None):
+    """Extract categories concurrently and return one merged result set
+
+    categories is a list of names from section_categories() (all six when
+    None). Each of the max_workers processes runs its own browser.
+    """
+    sections = section_categories()
+    categories = categories or list(sections)
+    session_file = session_file or SessionStore().filename
+    rate_limiter = SharedRateLimiter(requests_per_minute)
+    started = time.perf_counter()
+    results = []
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(categories)), initializer=init_worker,
+                             initargs=(rate_limiter, headless, session_file)) as executor:
+        futures = [executor.submit(extract_category, name, sections[name], max_products) for name in categories]
+        for future in as_completed(futures):
+            result = future.result()
+            status = result['error'] or f"{len(result['products'])} products"
+            print(f"{result['category']}: {status} in {result['elapsed_seconds']}s")
+            results.append(result)
+
+    # Keep the requested category order in the merged output
+    results.sort(key=lambda result: categories.index(result['category']))
+    products = [product for result in results for product in result['products']]
+    return {
+        'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'elapsed_seconds': round(time.perf_counter() - started, 2),
+        'total_products': len(products),
+        'categories': [{
+            'category': result['category'],
+            'total_products': len(result['products']),
+            'elapsed_seconds': result['elapsed_seconds'],
+            'error': result['error']
+        } for result in results],
+        'products': products
+    }
+
+def save_merged_results(merged):
+    """Save the merged result set to one JSON file, one CSV file and one workbook with a sheet per category"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    json_file = f"hot_new_releases_all_categories_{timestamp}.json"
+    csv_file = f"hot_new_releases_all_categories_{timestamp}.csv"
+    write_json_file(json_file, merged)
+    # Rows keep their own category, unlike write_csv_file which stamps one on every row
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(merged['products'])
+    excel_file = write_products_excel(f"hot_new_releases_all_categories_{timestamp}.xlsx", merged['products'])
+    print(f"Merged results saved to {json_file}, {csv_file} and {excel_file}")
+    return json_file, csv_file, excel_file
+
+def main():
+    """Extract all Section_* categories in parallel (credentials from AMAZON_EMAIL / AMAZON_PASSWORD)"""
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    email = os.environ.get('AMAZON_EMAIL')
+    password = os.environ.get('AMAZON_PASSWORD')
+
+    if SessionStore().load() is None:
+        if not (email and password):
+            print("No saved session - set AMAZON_EMAIL and AMAZON_PASSWORD to log in once")
+            sys.exit(1)
+        if not prepare_shared_session(email, password):
+            print("Login failed - not starting the workers")
+            sys.exit(1)
+
+    merged = run_parallel_extraction(max_workers=max_workers)
+    save_merged_results(merged)
+    print(f"Extracted {merged['total_products']} products from {len(merged['categories'])} categories "
+          f"in {merged['elapsed_seconds']}s")
+    print(json.dumps(merged['categories'], indent=2))
+
+if __name__ == "__main__":
+    main()
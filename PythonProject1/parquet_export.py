@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Parquet History Export
+Writes the product history as typed, compressed Parquet partitioned by category and date for fast DataFrame analytics
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from product_fields import parse_price, parse_rating
+from product_history import get_product_history
+
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history_parquet')
+
+# Files starting with '_' are skipped when the dataset is read back
+STATE_FILE = '_export_state.json'
+
+PARTITION_COLUMNS = ['category', 'date']
+
+OBSERVATIONS_SQL = """
+SELECT o.id AS observation_id, p.product_key, c.name AS category, o.extracted_at, o.ranking, o.title,
+       o.price AS price_text, o.rating AS rating_text, o.source
+FROM observations o
+JOIN products p ON p.id = o.product_id
+JOIN categories c ON c.id = o.category_id
+WHERE o.id > ? AND o.id <= ?
+ORDER BY o.id
+"""
+
+SCHEMA = pa.schema([
+    ('observation_id', pa.int64()),
+    ('product_key', pa.string()),
+    ('asin', pa.string()),
+    ('extracted_at', pa.timestamp('s')),
+    ('ranking', pa.int16()),
+    ('title', pa.string()),
+    ('price', pa.float64()),
+    ('rating', pa.float32()),
+    ('price_text', pa.string()),
+    ('rating_text', pa.string()),
+    ('source', pa.string()),
+    ('category', pa.string()),
+    ('date', pa.string())
+])
+
+def load_state(root):
+    """Export watermark of a dataset directory - {'last_observation_id': 0} for a new one
+
+    'pending_observation_id' is the high-water mark of an export that was
+    started but not finished.
+    """
+    try:
+        with open(os.path.join(root, STATE_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'last_observation_id': 0}
+
+def save_state(root, state):
+    """Write the export watermark atomically"""
+    path = os.path.join(root, STATE_FILE)
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.part', path)
+
+def observations_frame(history, after_id, up_to_id):
+    """Observations with after_id < id <= up_to_id as a typed DataFrame with numeric price and rating"""
+    frame = pd.read_sql_query(OBSERVATIONS_SQL, history.connection(), params=(after_id, up_to_id))
+    frame['asin'] = frame['product_key'].where(~frame['product_key'].str.startswith('title:'))
+    frame['extracted_at'] = pd.to_datetime(frame['extracted_at'], format='%Y-%m-%d %H:%M:%S')
+    frame['date'] = frame['extracted_at'].dt.strftime('%Y-%m-%d')
+    frame['price'] = frame['price_text'].map(parse_price)
+    frame['rating'] = frame['rating_text'].map(parse_rating)
+    return frame
+
+def export_history(root=EXPORT_DIR, mode='append', history=None):
+    """Export the product history to a Parquet dataset under root - returns the number of rows written
+
+    mode='append' writes only observations added since the last export,
+    as new files in their category/date partitions; files already written
+    are never rewritten. mode='overwrite' rebuilds the dataset from scratch.
+    """
+    history = history or get_product_history()
+    if mode == 'overwrite' and os.path.isdir(root):
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+
+    state = load_state(root)
+    # An interrupted export is redone over exactly the rows it covered, so
+    # it rewrites the same files; rows recorded since go to the next export
+    last_id = state.get('pending_observation_id')
+    if last_id is None:
+        last_id = history.connection().execute("SELECT COALESCE(MAX(id), 0) FROM observations").fetchone()[0]
+    frame = observations_frame(history, state['last_observation_id'], last_id)
+    if frame.empty:
+        print(f"Parquet export up to date ({root})")
+        return 0
+
+    save_state(root, dict(state, pending_observation_id=last_id))
+    table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+    # The file name carries the high-water mark, so each export adds its own files
+    pq.write_to_dataset(table, root, partition_cols=PARTITION_COLUMNS, compression='zstd',
+                        basename_template=f"part-{last_id}-{{i}}.parquet",
+                        existing_data_behavior='overwrite_or_ignore')
+    save_state(root, {'last_observation_id': last_id,
+                      'exported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+
+    partitions = frame.groupby(PARTITION_COLUMNS).ngroups
+    print(f"Exported {len(frame)} observations into {partitions} partitions of {root}")
+    return len(frame)
+
+def load_history(root=EXPORT_DIR, categories=None, since=None, until=None, columns=None):
+    """Read the exported history into a DataFrame
+
+    categories and the since/until dates ('YYYY-MM-DD', until excluded)
+    prune whole partitions before any file is opened; columns limits what
+    is read from the files that remain.
+    """
+    filters = []
+    if categories:
+        filters.append(('category', 'in', list(categories)))
+    if since:
+        filters.append(('date', '>=', since[:10]))
+    if until:
+        filters.append(('date', '<', until[:10]))
+    # Nullable dtypes keep ranking an integer column even where it is missing
+    return pd.read_parquet(root, engine='pyarrow', columns=columns, filters=filters or None,
+                           dtype_backend='numpy_nullable')
+
+def main():
+    """Export the history (append by default) or load it back and time the read"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'append'
+    root = sys.argv[2] if len(sys.argv) > 2 else EXPORT_DIR
+    started = time.perf_counter()
+
+    if command in ('append', 'overwrite'):
+        export_history(root, command)
+    elif command == 'load':
+        frame = load_history(root)
+        print(frame.dtypes)
+        print(f"Loaded {len(frame)} observations")
+    else:
+        print("Usage: python parquet_export.py [append|overwrite|load] [directory]")
+        sys.exit(1)
+
+    print(f"({time.perf_counter() - started:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Product Fields
+Canonical product identity (the ASIN from a product's /dp/ link) and numeric values parsed from price and rating text
+"""
+
+import re
+
+# /dp/<ASIN> or /gp/product/<ASIN>, absolute or relative, with or without a trailing slug
+ASIN_PATTERN = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})(?=[/?#]|$)')
+
+PRODUCT_LINK_XPATH = ".//a[contains(@href, '/dp/')]"
+
+# First amount in a price text - Indian (1,29,999) or western (129,999.00) grouping
+PRICE_PATTERN = re.compile(r'(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)')
+
+RATING_PATTERN = re.compile(r'(\d(?:\.\d+)?)\s*out of\s*5')
+
+
+def extract_asin(url):
+    """ASIN from a product URL, or None if it has none"""
+    match = ASIN_PATTERN.search(url) if url else None
+    return match.group(1) if match else None
+
+
+def parse_price(text):
+    """Amount of a price text like '₹1,299.00' as a float, or None for 'Price Not Available' and the like"""
+    match = PRICE_PATTERN.search(text) if text else None
+    return float(match.group(1).replace(',', '')) if match else None
+
+
+def parse_rating(text):
+    """Stars of a rating text like '4.3 out of 5 stars' as a float, or None"""
+    match = RATING_PATTERN.search(text) if text else None
+    return float(match.group(1)) if match else None
+
+
+def get_product_link(container):
+    """href of the container's first /dp/ link (or of the container itself when it is one), or None"""
+    try:
+        if container.tag_name == 'a':
+            href = container.get_attribute('href')
+            if href and '/dp/' in href:
+                return href
+        # 'xpath' is By.XPATH - importing selenium here would tie the offline parsers to it
+        links = container.find_elements('xpath', PRODUCT_LINK_XPATH)
+        return links[0].get_attribute('href') if links else None
+    except Exception:
+        return None
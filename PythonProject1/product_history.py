@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Product History Store
+Keeps every extracted product observation in one SQLite database so rank and price history is a single indexed query
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from product_fields import extract_asin
+from stream_writer import read_jsonl
+
+# Only these functions become keywords when imported as a Robot library
+__all__ = ['record_products', 'get_rank_history']
+
+HISTORY_DB = os.environ.get('AMAZON_HISTORY_DB',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'product_history.db'))
+
+TIMESTAMP_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y%m%d_%H%M%S']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    product_key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    link TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    started_at TEXT NOT NULL,
+    source TEXT,
+    UNIQUE (category_id, started_at)
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    extracted_at TEXT NOT NULL,
+    ranking INTEGER,
+    title TEXT,
+    price TEXT,
+    rating TEXT,
+    source TEXT,
+    run_id INTEGER REFERENCES runs(id)
+);
+CREATE INDEX IF NOT EXISTS observations_category_time ON observations(category_id, extracted_at);
+CREATE INDEX IF NOT EXISTS observations_product_time ON observations(product_id, extracted_at);
+"""
+
+# Created after migrate, which adds run_id to databases that predate runs
+RUN_INDEXES = """
+CREATE INDEX IF NOT EXISTS observations_run ON observations(run_id, ranking);
+CREATE UNIQUE INDEX IF NOT EXISTS observations_unique ON observations(product_id, category_id, extracted_at);
+"""
+
+def product_key(product):
+    """Stable identity of a product: its ASIN when the link has one, else its normalized title"""
+    asin = product.get('asin') or extract_asin(product.get('link'))
+    if asin:
+        return asin
+    return 'title:' + ' '.join((product.get('title') or '').lower().split())
+
+def normalize_timestamp(value):
+    """'YYYY-MM-DD HH:MM:SS' for any timestamp format the extractors write (now if missing or unknown)"""
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(str(value), timestamp_format).strftime(TIMESTAMP_FORMATS[0])
+        except ValueError:
+            continue
+    return datetime.now().strftime(TIMESTAMP_FORMATS[0])
+
+class ProductHistory:
+    """SQLite store of categories, products and one observation per product per run
+
+    The database runs in WAL mode so readers never block the writer, and
+    each thread gets its own connection. Concurrent writers (threads or
+    worker processes) wait up to busy_timeout seconds for the write lock.
+    """
+
+    def __init__(self, filename=HISTORY_DB, busy_timeout=30):
+        self.filename = filename
+        self.busy_timeout = busy_timeout
+        self.local = threading.local()
+        connection = self.connection()
+        connection.executescript(SCHEMA)
+        self.migrate(connection)
+        connection.executescript(RUN_INDEXES)
+
+    def connection(self):
+        """This thread's connection, opened and configured on first use"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            # Autocommit mode - record_run manages its own transactions
+            connection = sqlite3.connect(self.filename, timeout=self.busy_timeout, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self.local.connection = connection
+        return connection
+
+    def migrate(self, connection):
+        """Add runs to a database created before they existed
+
+        Duplicate observations (a run recorded live and imported again) are
+        dropped, and since old observations carry no run, a category's
+        observations from the same minute are taken to be one run.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = [row['name'] for row in connection.execute("PRAGMA table_info(observations)")]
+            if 'run_id' not in columns:
+                connection.execute("ALTER TABLE observations ADD COLUMN run_id INTEGER REFERENCES runs(id)")
+                connection.execute("""
+                    DELETE FROM observations WHERE id NOT IN
+                        (SELECT MIN(id) FROM observations GROUP BY product_id, category_id, extracted_at)
+                """)
+                connection.execute("""
+                    INSERT OR IGNORE INTO runs (category_id, started_at, source)
+                    SELECT category_id, MIN(extracted_at), MIN(source) FROM observations
+                    GROUP BY category_id, substr(extracted_at, 1, 16)
+                """)
+                connection.execute("""
+                    UPDATE observations SET run_id = (
+                        SELECT r.id FROM runs r WHERE r.category_id = observations.category_id
+                          AND substr(r.started_at, 1, 16) = substr(observations.extracted_at, 1, 16))
+                """)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def record_run(self, products, category_name=None, source=None):
+        """Store one run's products in a single transaction - returns the number of observations written
+
+        Products keep their own 'category' when they have one (merged
+        multi-category runs); category_name is used for the rest. Each
+        category gets a run starting at its earliest extracted_at, so
+        recording the same products again (a live run and then an import
+        of its JSON file) adds nothing.
+        """
+        rows = []
+        started = {}
+        for product in products:
+            category = product.get('category') or category_name or "Unknown Category"
+            extracted_at = normalize_timestamp(product.get('extracted_at'))
+            rows.append((product_key(product), category, extracted_at, product))
+            started[category] = min(started.get(category, extracted_at), extracted_at)
+        if not rows:
+            return 0
+
+        connection = self.connection()
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent
+        # writers queue on busy_timeout instead of failing mid-transaction
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                                   [(category,) for category in started])
+            connection.executemany("""
+                INSERT OR IGNORE INTO runs (category_id, started_at, source)
+                VALUES ((SELECT id FROM categories WHERE name = ?), ?, ?)
+            """, [(category, started_at, source) for category, started_at in started.items()])
+            run_ids = {category: connection.execute("""
+                SELECT id FROM runs WHERE category_id = (SELECT id FROM categories WHERE name = ?) AND started_at = ?
+            """, (category, started_at)).fetchone()[0] for category, started_at in started.items()}
+            connection.executemany("""
+                INSERT INTO products (product_key, title, link, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    title = excluded.title,
+                    link = COALESCE(excluded.link, products.link),
+                    first_seen = MIN(products.first_seen, excluded.first_seen),
+                    last_seen = MAX(products.last_seen, excluded.last_seen)
+            """, [(key, product.get('title'), product.get('link'), extracted_at, extracted_at)
+                  for key, _, extracted_at, product in rows])
+            written = connection.executemany("""
+                INSERT OR IGNORE INTO observations
+                    (product_id, category_id, extracted_at, ranking, title, price, rating, source, run_id)
+                VALUES ((SELECT id FROM products WHERE product_key = ?), (SELECT id FROM categories WHERE name = ?),
+                        ?, ?, ?, ?, ?, ?, ?)
+            """, [(key, category, extracted_at, product.get('ranking'), product.get('title'), product.get('price'),
+                   product.get('rating'), source, run_ids[category])
+                  for key, category, extracted_at, product in rows]).rowcount
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return written
+
+    def query(self, sql, parameters=()):
+        """Run a read query and return the rows as dictionaries"""
+        return [dict(row) for row in self.connection().execute(sql, parameters)]
+
+    def rank_history(self, key, since=None, until=None):
+        """Every observation of one product (ASIN or product_key) in time order, from since up to but excluding until"""
+        return self.query("""
+            SELECT o.extracted_at, c.name AS category, o.ranking, o.title, o.price, o.rating
+            FROM observations o
+            JOIN products p ON p.id = o.product_id
+            JOIN categories c ON c.id = o.category_id
+            WHERE p.product_key = ? AND o.extracted_at >= ? AND o.extracted_at < ?
+            ORDER BY o.extracted_at
+        """, (key, since or '', until or '9999'))
+
+    def category_history(self, category_name, since=None, until=None):
+        """Every run of a category that started from since up to but excluding until, run by run in rank order"""
+        return self.query("""
+            SELECT r.id AS run_id, r.started_at, o.extracted_at, p.product_key, o.ranking, o.title, o.price, o.rating
+            FROM runs r
+            JOIN observations o ON o.run_id = r.id
+            JOIN products p ON p.id = o.product_id
+            WHERE r.category_id = (SELECT id FROM categories WHERE name = ?)
+              AND r.started_at >= ? AND r.started_at < ?
+            ORDER BY r.started_at, r.id, o.ranking
+        """, (category_name, since or '', until or '9999'))
+
+    def latest(self, category_name):
+        """The products of a category's most recent run, in rank order"""
+        return self.query("""
+            SELECT r.id AS run_id, r.started_at, o.extracted_at, p.product_key, o.ranking, o.title, o.price, o.rating
+            FROM observations o
+            JOIN runs r ON r.id = o.run_id
+            JOIN products p ON p.id = o.product_id
+            WHERE o.run_id = (SELECT id FROM runs WHERE category_id = (SELECT id FROM categories WHERE name = ?)
+                              ORDER BY started_at DESC, id DESC LIMIT 1)
+            ORDER BY o.ranking
+        """, (category_name,))
+
+    def categories(self):
+        """[{'name', 'runs', 'observations', 'first_seen', 'last_seen'}] for every category in the store"""
+        return self.query("""
+            SELECT c.name, (SELECT COUNT(*) FROM runs r WHERE r.category_id = c.id) AS runs, COUNT(o.id) AS observations, MIN(o.extracted_at) AS first_seen,
+                   MAX(o.extracted_at) AS last_seen
+            FROM categories c LEFT JOIN observations o ON o.category_id = c.id
+            GROUP BY c.id ORDER BY c.name
+        """)
+
+    def import_json_files(self, filenames):
+        """Load earlier hot_new_releases_*.json result files into the store - returns the observations added
+
+        Streamed .jsonl files, including the .jsonl.part output a failed run
+        left behind, are loaded too; each line carries its own category.
+        """
+        total = 0
+        for filename in filenames:
+            try:
+                if '.jsonl' in filename:
+                    total += self.record_run(read_jsonl(filename), source=os.path.basename(filename))
+                    continue
+                with open(filename, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                total += self.record_run(data.get('products', []), data.get('category'), os.path.basename(filename))
+            except Exception as e:
+                print(f"Could not import {filename}: {str(e)}")
+        return total
+
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+# Process-wide store, opened on first use
+_history = None
+_history_lock = threading.Lock()
+
+def get_product_history():
+    """The process-wide ProductHistory"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = ProductHistory()
+        return _history
+
+def record_products(products, category_name=None, source=None):
+    """Append one run's products to the history store; returns the number stored (0 on failure)"""
+    try:
+        count = get_product_history().record_run(products, category_name, source)
+        print(f"Recorded {count} products in product history")
+        return count
+    except Exception as e:
+        print(f"Error recording product history: {str(e)}")
+        return 0
+
+def get_rank_history(key, since=None, until=None):
+    """Rank, price and rating observations of one product (ASIN or product key) over time"""
+    return get_product_history().rank_history(key, since, until)
+
+def main():
+    """Import saved result files or print a product's or category's history"""
+    if len(sys.argv) < 2:
+        print("Usage: python product_history.py import [<file.json> ...] | product <asin> | category <name> | categories")
+        sys.exit(1)
+
+    history = get_product_history()
+    command = sys.argv[1]
+    started = time.perf_counter()
+
+    if command == "import":
+        filenames = sys.argv[2:] or sorted(glob.glob("hot_new_releases_*.json"))
+        print(f"Imported {history.import_json_files(filenames)} observations from {len(filenames)} files")
+    elif command == "product" and len(sys.argv) > 2:
+        for row in history.rank_history(sys.argv[2]):
+            print(f"{row['extracted_at']}  #{row['ranking']}  {row['price']}  {row['rating']}  {row['category']}")
+    elif command == "category" and len(sys.argv) > 2:
+        for row in history.category_history(sys.argv[2]):
+            print(f"{row['started_at']}  #{row['ranking']}  {row['product_key']}  {row['title']}")
+    elif command == "categories":
+        print(json.dumps(history.categories(), indent=2, ensure_ascii=False))
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
+
+    print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
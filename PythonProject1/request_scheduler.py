@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler
+Central per-host token-bucket pacing for every page load and HTTP request, with measured throughput
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+# Default budget, overridable with AMAZON_REQUESTS_PER_MINUTE / AMAZON_BURST
+DEFAULT_REQUESTS_PER_MINUTE = float(os.environ.get('AMAZON_REQUESTS_PER_MINUTE', 30))
+DEFAULT_BURST = int(os.environ.get('AMAZON_BURST', 3))
+
+class TokenBucket:
+    """Thread-safe token bucket: bursts of up to burst requests, refilled at requests_per_minute"""
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it (0 when one is available)
+
+        Tokens may go negative, so concurrent callers queue up behind each
+        other instead of all waking at the same refill.
+        """
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RequestScheduler:
+    """Paces requests with one token bucket per host and records how long callers waited"""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST, host_limits=None):
+        """host_limits maps a host to its own (requests_per_minute, burst); 0 requests per minute disables pacing"""
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.host_limits = dict(host_limits or {})
+        self.buckets = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def configure(self, requests_per_minute=None, burst=None, host=None):
+        """Change the default budget, or one host's budget when host is given"""
+        with self.lock:
+            if host:
+                current = self.host_limits.get(host, (self.requests_per_minute, self.burst))
+                self.host_limits[host] = (requests_per_minute if requests_per_minute is not None else current[0],
+                                          burst if burst is not None else current[1])
+                self.buckets.pop(host, None)
+            else:
+                if requests_per_minute is not None:
+                    self.requests_per_minute = requests_per_minute
+                if burst is not None:
+                    self.burst = burst
+                self.buckets = {h: b for h, b in self.buckets.items() if h in self.host_limits}
+
+    def bucket(self, host):
+        """Token bucket for host, created from its budget on first use"""
+        with self.lock:
+            if host not in self.buckets:
+                requests_per_minute, burst = self.host_limits.get(host, (self.requests_per_minute, self.burst))
+                self.buckets[host] = TokenBucket(requests_per_minute, burst)
+            return self.buckets[host]
+
+    def reserve(self, url):
+        """Reserve a request slot for url's host and return the seconds to wait for it"""
+        host = urlsplit(url).netloc.lower() or url
+        delay = self.bucket(host).reserve()
+        with self.lock:
+            counter = self.counters.setdefault(host, {'requests': 0, 'waited_seconds': 0.0})
+            counter['requests'] += 1
+            counter['waited_seconds'] += delay
+        return delay
+
+    def wait(self, url):
+        """Block until a request to url fits the budget - returns the seconds waited"""
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, url):
+        """asyncio version of wait"""
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+    def stats(self):
+        """Per-host request counts, time spent waiting and achieved requests per minute"""
+        elapsed_minutes = max(time.monotonic() - self.started, 1e-6) / 60.0
+        with self.lock:
+            return {host: {
+                'requests': counter['requests'],
+                'waited_seconds': round(counter['waited_seconds'], 2),
+                'requests_per_minute': round(counter['requests'] / elapsed_minutes, 1)
+            } for host, counter in self.counters.items()}
+
+    def print_stats(self):
+        """Print the stats() summary"""
+        for host, stats in self.stats().items():
+            print(f"{host}: {stats['requests']} requests, {stats['requests_per_minute']}/min, "
+                  f"{stats['waited_seconds']}s waiting for the budget")
+
+# Process-wide scheduler shared by the extractors and fetchers
+_scheduler = RequestScheduler()
+
+def get_scheduler():
+    """The process-wide RequestScheduler"""
+    return _scheduler
+
+def configure_scheduler(requests_per_minute=None, burst=None, host=None):
+    """Change the process-wide budget (see RequestScheduler.configure)"""
+    _scheduler.configure(requests_per_minute, burst, host)
+
+# Page loads made through the scheduled_* helpers, per driver; drivers are not kept alive by it
+_navigations = weakref.WeakKeyDictionary()
+_navigations_lock = threading.Lock()
+
+def count_navigation(driver):
+    """Record one page load made by driver"""
+    with _navigations_lock:
+        _navigations[driver] = _navigations.get(driver, 0) + 1
+
+def navigation_count(driver):
+    """Number of page loads driver has made through the scheduled_* helpers"""
+    with _navigations_lock:
+        return _navigations.get(driver, 0)
+
+def scheduled_get(driver, url):
+    """driver.get(url) once the budget allows it"""
+    _scheduler.wait(url)
+    count_navigation(driver)
+    driver.get(url)
+
+def scheduled_click(driver, element):
+    """element.click() on a link or button that loads a new page, once the budget allows it"""
+    _scheduler.wait(driver.current_url)
+    count_navigation(driver)
+    element.click()
+
+def scheduled_refresh(driver):
+    """driver.refresh() once the budget allows it"""
+    _scheduler.wait(driver.current_url)
+    count_navigation(driver)
+    driver.refresh()
+
+if __name__ == "__main__":
+    print(f"Default budget: {DEFAULT_REQUESTS_PER_MINUTE:g} requests per minute per host, burst {DEFAULT_BURST}")
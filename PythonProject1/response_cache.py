@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+HTTP Response Cache
+On-disk cache of compressed page bodies with a freshness TTL, conditional revalidation and size-bounded LRU eviction
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+
+# Amazon tracking parameters that do not change the page content
+IGNORED_PARAMS = {'ref', 'ref_', 'pd_rd_w', 'pd_rd_r', 'pd_rd_wg', 'pf_rd_p', 'pf_rd_r', 'pf_rd_s', 'pf_rd_t', 'pf_rd_i', 'pf_rd_m', 'psc', 'th'}
+
+# Response headers worth keeping with the body
+STORED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+def normalize_url(url):
+    """Canonical form of url used as the cache key
+
+    Lower-cases scheme and host, drops the fragment, Amazon /ref=... path
+    segments and tracking parameters, and sorts the remaining query.
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    if '/ref=' in path:
+        path = path[:path.index('/ref=') + 1]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if key not in IGNORED_PARAMS))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path or '/', query, ''))
+
+class ResponseCache:
+    """Gzip-compressed response bodies plus a JSON metadata file per normalized URL"""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=900, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def paths(self, url):
+        """(metadata path, body path) for url"""
+        key = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body.gz'
+
+    def get(self, url):
+        """Return {'body', 'meta', 'fresh'} for a cached url, or None
+
+        Reading an entry marks it as recently used for LRU eviction.
+        """
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = gzip.decompress(f.read())
+        except (OSError, ValueError):
+            return None
+
+        # The entry may have been evicted by another process since it was read
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return {'body': body, 'meta': meta, 'fresh': time.time() - meta['stored_at'] < self.ttl}
+
+    def put(self, url, headers, body):
+        """Store a 200 response body and its validators, then evict old entries if over max_bytes"""
+        meta_path, body_path = self.paths(url)
+        meta = {
+            'url': normalize_url(url),
+            'stored_at': time.time(),
+            'size': len(body),
+            'headers': {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        }
+        try:
+            with open(body_path + '.part', 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(body_path + '.part', body_path)
+            with open(meta_path + '.part', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.part', meta_path)
+        except OSError as e:
+            print(f"Could not cache {url}: {str(e)}")
+            return
+        self.evict()
+
+    def refresh(self, url):
+        """Mark an entry fresh again after the server answered 304 Not Modified"""
+        meta_path, _ = self.paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['stored_at'] = time.time()
+            with open(meta_path + '.part', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.part', meta_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not refresh cache entry for {url}: {str(e)}")
+
+    def validators(self, entry):
+        """Conditional request headers (If-None-Match / If-Modified-Since) for a stale entry"""
+        headers = {}
+        if entry:
+            if entry['meta']['headers'].get('ETag'):
+                headers['If-None-Match'] = entry['meta']['headers']['ETag']
+            if entry['meta']['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = entry['meta']['headers']['Last-Modified']
+        return headers
+
+    def evict(self):
+        """Delete least recently used entries until the compressed bodies fit in max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            body_path = meta_path[:-len('.json')] + '.body.gz'
+            try:
+                size = os.path.getsize(body_path)
+                entries.append((os.path.getmtime(meta_path), size, meta_path, body_path))
+                total += size
+            except OSError:
+                continue
+
+        if total <= self.max_bytes:
+            return
+        for _, size, meta_path, body_path in sorted(entries):
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Delete every cached entry"""
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+
+def cached_get(session, url, cache, timeout=15, scheduler=None):
+    """GET url through a requests session and the cache - returns (status, body, source)
+
+    source is 'hit' (fresh, no network), 'revalidated' (304 from the
+    server) or 'network'. body is None for non-200 responses. Only
+    requests that reach the network wait for the scheduler's budget.
+    """
+    entry = cache.get(url)
+    if entry and entry['fresh']:
+        return 200, entry['body'], 'hit'
+
+    if scheduler:
+        scheduler.wait(url)
+    response = session.get(url, headers=cache.validators(entry), timeout=timeout)
+    if response.status_code == 304 and entry:
+        cache.refresh(url)
+        return 200, entry['body'], 'revalidated'
+    if response.status_code == 200:
+        cache.put(url, response.headers, response.content)
+        return 200, response.content, 'network'
+    return response.status_code, None, 'network'
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'clear':
+        ResponseCache().clear()
+        print("Response cache cleared")
+    else:
+        print("Usage: python response_cache.py clear")
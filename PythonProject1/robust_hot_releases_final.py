@@ -5,25 +5,37 @@ Handles blank page issues with multiple fallback strategies
 """
 
 import json
-import csv
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import re
 import random
+from bulk_extractor import extract_products_in_browser
+from dom_candidates import find_candidate_containers
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from selector_stats import first_match
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
+from page_health import probe_page_health, print_page_health, has_marker
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import ProductStreamWriter
+from excel_writer import write_products_excel
 
 class RobustHotNewReleasesExtractor:
-    def __init__(self, headless=False):
-        """Initialize the extractor with Chrome WebDriver"""
+    def __init__(self, headless=False, driver_pool=None):
+        """Initialize the extractor with Chrome WebDriver (borrowed from driver_pool when given)"""
         self.driver = None
         self.headless = headless
-        self.setup_driver()
+        self.driver_pool = driver_pool
+        if driver_pool:
+            self.driver = driver_pool.acquire()
+        else:
+            self.setup_driver()
     
     def setup_driver(self):
         """Setup Chrome WebDriver with anti-detection measures"""
@@ -64,7 +76,7 @@ class RobustHotNewReleasesExtractor:
         }
         chrome_options.add_experimental_option("prefs", prefs)
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         
         # Execute anti-detection scripts
@@ -81,45 +93,37 @@ class RobustHotNewReleasesExtractor:
             print("Starting login process...")
             
             # Navigate to Amazon
-            self.driver.get("https://www.amazon.in/")
-            time.sleep(random.uniform(3, 5))
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on Sign In
             sign_in_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[text()='Hello, sign in']"))
             )
-            sign_in_element.click()
-            time.sleep(random.uniform(2, 4))
+            scheduled_click(self.driver, sign_in_element)
             
             # Enter email
             email_field = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, "//input[@name='email']"))
             )
             email_field.clear()
-            for char in email:
-                email_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))
-            time.sleep(random.uniform(1, 2))
+            email_field.send_keys(email)
             
             # Click Continue
             continue_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            continue_button.click()
-            time.sleep(random.uniform(2, 4))
+            scheduled_click(self.driver, continue_button)
             
             # Enter password
             password_field = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, "//input[@name='password']"))
             )
             password_field.clear()
-            for char in password:
-                password_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))
-            time.sleep(random.uniform(1, 2))
+            password_field.send_keys(password)
             
             # Click Sign In
             sign_in_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            sign_in_button.click()
-            time.sleep(random.uniform(5, 8))
+            scheduled_click(self.driver, sign_in_button)
+            wait_for_page_ready(self.driver)
             
             print("Login successful!")
             return True
@@ -135,25 +139,21 @@ class RobustHotNewReleasesExtractor:
             
             # Strategy 1: Direct navigation
             print("Trying direct navigation...")
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            time.sleep(random.uniform(8, 12))
+            scheduled_get(self.driver, "https://www.amazon.in/gp/new-releases/")
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Check if page loaded properly
-            page_title = self.driver.title
-            print(f"Page title: {page_title}")
-            
-            # Check page source length
-            page_source = self.driver.page_source
-            print(f"Page source length: {len(page_source)}")
+            health = probe_page_health(self.driver)
+            print_page_health(health)
             
             # If page seems blank, try alternative approaches
-            if len(page_source) < 5000 or "Hot New Releases" not in page_source:
+            if health['html_length'] < 5000 or not health['markers']['Hot New Releases']:
                 print("Page appears blank, trying alternative navigation...")
                 
                 # Strategy 2: Navigate through menu
                 print("Trying menu navigation...")
-                self.driver.get("https://www.amazon.in/")
-                time.sleep(random.uniform(3, 5))
+                scheduled_get(self.driver, "https://www.amazon.in/")
+                wait_for_page_ready(self.driver)
                 
                 # Click on category menu
                 try:
@@ -161,7 +161,7 @@ class RobustHotNewReleasesExtractor:
                         EC.element_to_be_clickable((By.XPATH, "//span[@class='hm-icon-label'][1]"))
                     )
                     category_menu.click()
-                    time.sleep(random.uniform(2, 4))
+                    wait_for_page_ready(self.driver)
                     
                     # Look for "All" category
                     all_category = None
@@ -180,7 +180,7 @@ class RobustHotNewReleasesExtractor:
                     
                     if all_category:
                         all_category.click()
-                        time.sleep(random.uniform(2, 4))
+                        wait_for_page_ready(self.driver)
                     
                     # Look for "New Releases"
                     new_releases = None
@@ -198,8 +198,8 @@ class RobustHotNewReleasesExtractor:
                             continue
                     
                     if new_releases:
-                        new_releases.click()
-                        time.sleep(random.uniform(5, 8))
+                        scheduled_click(self.driver, new_releases)
+                        wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
                     
                 except Exception as e:
                     print(f"Menu navigation failed: {str(e)}")
@@ -215,11 +215,11 @@ class RobustHotNewReleasesExtractor:
                 for url in alternative_urls:
                     try:
                         print(f"Trying URL: {url}")
-                        self.driver.get(url)
-                        time.sleep(random.uniform(5, 8))
+                        scheduled_get(self.driver, url)
+                        wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
                         
-                        page_source = self.driver.page_source
-                        if len(page_source) > 5000 and ("Hot New Releases" in page_source or "New Releases" in page_source):
+                        health = probe_page_health(self.driver)
+                        if health['html_length'] > 5000 and has_marker(health):
                             print(f"Successfully loaded page from: {url}")
                             break
                     except Exception as e:
@@ -227,8 +227,8 @@ class RobustHotNewReleasesExtractor:
                         continue
             
             # Final check
-            page_source = self.driver.page_source
-            if len(page_source) < 5000:
+            health = probe_page_health(self.driver)
+            if health['html_length'] < 5000:
                 print("Warning: Page still appears to be blank or very short")
                 # Take screenshot for debugging
                 self.driver.save_screenshot("debug_blank_page.png")
@@ -269,19 +269,30 @@ class RobustHotNewReleasesExtractor:
             print(f"Error getting category name: {str(e)}")
             return "Hot New Releases - Unknown Category"
     
-    def extract_products(self, max_products=5):
+    def extract_products(self, max_products=5, bulk=True, on_product=None):
         """Extract product information with multiple strategies"""
         products = []
         
         try:
             print("Looking for product elements...")
             
-            # Wait for page to load
-            time.sleep(random.uniform(5, 8))
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Scroll to load content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(random.uniform(2, 4))
+            wait_for_page_ready(self.driver)
+            
+            # Bulk mode: every product record in a single execute_script round trip
+            if bulk:
+                products = extract_products_in_browser(self.driver, max_products)
+                if products:
+                    if on_product:
+                        for product in products:
+                            on_product(product)
+                    print(f"\nSuccessfully extracted {len(products)} products")
+                    return products
+                print("Bulk extraction found no products, falling back to element-by-element extraction...")
             
             # Try multiple strategies to find products
             product_containers = []
@@ -294,15 +305,13 @@ class RobustHotNewReleasesExtractor:
                 "//div[contains(@class, 'product')]"
             ]
             
-            for locator in primary_locators:
-                try:
-                    containers = self.driver.find_elements(By.XPATH, locator)
-                    if containers:
-                        product_containers = containers
-                        print(f"Found {len(containers)} product containers using: {locator}")
-                        break
-                except:
-                    continue
+            def containers_for(locator):
+                containers = self.driver.find_elements(By.XPATH, locator)
+                if containers:
+                    print(f"Found {len(containers)} product containers using: {locator}")
+                return containers
+            
+            product_containers = first_match('product_container', primary_locators, containers_for) or []
             
             # Strategy 2: Look for product links
             if not product_containers:
@@ -313,24 +322,19 @@ class RobustHotNewReleasesExtractor:
                 except:
                     pass
             
-            # Strategy 3: Look for any elements with product-like content
+            # Strategy 3: Best-scoring product-like elements, scored inside the browser
             if not product_containers:
-                try:
-                    all_divs = self.driver.find_elements(By.XPATH, "//div")
-                    potential_products = []
-                    for div in all_divs:
-                        text = div.text.lower()
-                        if any(keyword in text for keyword in ['₹', '$', 'price', 'rating', 'stars', 'buy', 'add to cart']):
-                            potential_products.append(div)
-                    product_containers = potential_products
-                    print(f"Found {len(potential_products)} potential product divs")
-                except:
-                    pass
+                candidates = find_candidate_containers(self.driver, top_n=max_products * 2)
+                product_containers = [candidate['element'] for candidate in candidates]
+                print(f"Found {len(product_containers)} potential product divs")
             
             print(f"Total containers to process: {len(product_containers)}")
             
             # Extract products
-            for i, container in enumerate(product_containers[:max_products]):
+            seen_asins = set()
+            for i, container in enumerate(product_containers):
+                if len(products) >= max_products:
+                    break
                 try:
                     print(f"\n--- Processing Product {i+1} ---")
                     
@@ -343,17 +347,27 @@ class RobustHotNewReleasesExtractor:
                     # Extract rating
                     rating = self.get_product_rating(container)
                     
+                    # Extract the ASIN from the product's /dp/ link
+                    link = get_product_link(container)
+                    
                     product_data = {
                         'ranking': len(products) + 1,
+                        'asin': extract_asin(link),
                         'title': title,
                         'price': price,
                         'rating': rating,
+                        'link': link,
                         'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
                     
                     # Only add if we got meaningful data
-                    if title != "No Title Available" or price != "Price Not Available":
+                    if product_data['asin'] and product_data['asin'] in seen_asins:
+                        print(f"Skipping product {i+1} - duplicate of {product_data['asin']}")
+                    elif title != "No Title Available" or price != "Price Not Available":
+                        seen_asins.add(product_data['asin'])
                         products.append(product_data)
+                        if on_product:
+                            on_product(product_data)
                         print(f"Added product {len(products)}: {title[:50]}...")
                     else:
                         print(f"Skipping product {i+1} - no meaningful data")
@@ -383,14 +397,15 @@ class RobustHotNewReleasesExtractor:
             ".//div[contains(@class, 'name')]//span"
         ]
         
-        for selector in title_selectors:
-            try:
-                title_element = container.find_element(By.XPATH, selector)
-                title = title_element.text.strip()
+        def title_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                title = element.text.strip()
                 if title and len(title) > 5:
                     return title
-            except:
-                continue
+        
+        title = first_match('product_title', title_selectors, title_from)
+        if title:
+            return title
         
         # Fallback: get any meaningful text from the container
         try:
@@ -415,14 +430,15 @@ class RobustHotNewReleasesExtractor:
             ".//span[contains(@class, 'a-price-symbol')]/following-sibling::span"
         ]
         
-        for selector in price_selectors:
-            try:
-                price_element = container.find_element(By.XPATH, selector)
-                price = price_element.text.strip()
+        def price_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                price = element.text.strip()
                 if price and ('₹' in price or '$' in price):
                     return price
-            except:
-                continue
+        
+        price = first_match('product_price', price_selectors, price_from)
+        if price:
+            return price
         
         return "Price Not Available"
     
@@ -436,14 +452,15 @@ class RobustHotNewReleasesExtractor:
             ".//span[contains(text(), 'stars')]"
         ]
         
-        for selector in rating_selectors:
-            try:
-                rating_element = container.find_element(By.XPATH, selector)
-                rating = rating_element.text.strip()
+        def rating_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                rating = element.text.strip()
                 if rating and ('out of' in rating or 'stars' in rating):
                     return rating
-            except:
-                continue
+        
+        rating = first_match('product_rating', rating_selectors, rating_from)
+        if rating:
+            return rating
         
         return "No Rating Available"
     
@@ -470,29 +487,6 @@ class RobustHotNewReleasesExtractor:
             print(f"Error saving to JSON: {str(e)}")
             return None
     
-    def save_to_csv(self, products, category_name):
-        """Save products to CSV file (Excel compatible)"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"hot_new_releases_{self.sanitize_filename(category_name)}_{timestamp}.csv"
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for product in products:
-                    product['category'] = category_name
-                    product['extracted_at'] = timestamp
-                    writer.writerow(product)
-            
-            print(f"Products saved to CSV file: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error saving to CSV: {str(e)}")
-            return None
-    
     def sanitize_filename(self, filename):
         """Sanitize filename by removing/replacing invalid characters"""
         return re.sub(r'[<>:"/\\|?*]', '_', filename).replace(' ', '_')
@@ -503,7 +497,7 @@ class RobustHotNewReleasesExtractor:
             print("Starting Robust Hot New Releases extraction...")
             
             # Login to Amazon
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("Login failed!")
                 return False
             
@@ -515,8 +509,9 @@ class RobustHotNewReleasesExtractor:
             # Get category name
             category_name = self.get_category_name()
             
-            # Extract products
-            products = self.extract_products()
+            # Extract products, streaming each one to disk as it is found
+            with ProductStreamWriter(category_name) as stream:
+                products = self.extract_products(on_product=stream.write)
             
             if not products:
                 print("No products extracted!")
@@ -525,8 +520,14 @@ class RobustHotNewReleasesExtractor:
             # Save to JSON
             json_file = self.save_to_json(products, category_name)
             
-            # Save to CSV (Excel compatible)
-            csv_file = self.save_to_csv(products, category_name)
+            # The CSV was written row by row during extraction
+            csv_file = stream.csv_filename
+            
+            # Save a native Excel workbook with numeric price and rating cells
+            excel_file = write_products_excel(stream.basename + '.xlsx', products, category_name)
+            
+            # Append this run to the product history database
+            record_products(products, category_name)
             
             # Display results
             print("\n" + "="*50)
@@ -536,6 +537,8 @@ class RobustHotNewReleasesExtractor:
             print(f"Products extracted: {len(products)}")
             print(f"JSON file: {json_file}")
             print(f"CSV file: {csv_file}")
+            print(f"JSON Lines file: {stream.jsonl_filename}")
+            print(f"Excel file: {excel_file}")
             print("\nExtracted Products:")
             for product in products:
                 print(f"  {product['ranking']}. {product['title'][:60]}...")
@@ -548,8 +551,10 @@ class RobustHotNewReleasesExtractor:
             return False
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser, or hand it back to the driver pool"""
+        if self.driver and self.driver_pool:
+            self.driver_pool.release(self.driver)
+        elif self.driver:
             self.driver.quit()
 
 def main():
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Selector Statistics
+Persists hit/miss rates and latency of selector and strategy candidates so later runs try the likely winners first
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from file_lock import locked_file
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.selector_stats.json')
+
+class SelectorStats:
+    """Decaying hit/miss counters and total latency per (cascade, candidate)
+
+    A cascade is one ordered list of alternatives, e.g. 'product_title'.
+    Counts halve every half_life_days, so a layout change is picked up
+    after a few runs instead of being outvoted by old history. Only this
+    process's new attempts are added to the file when saving, so
+    concurrent workers all keep their counts.
+    """
+
+    def __init__(self, filename=STATS_FILE, half_life_days=7):
+        self.filename = filename
+        self.half_life = half_life_days * 86400
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.cascades = self.load()
+
+    def load(self):
+        """Read the stats file, decayed to now - {} if missing or unreadable"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                cascades = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        now = time.time()
+        for candidates in cascades.values():
+            for entry in candidates.values():
+                factor = 0.5 ** (max(now - entry['updated'], 0) / self.half_life)
+                entry['hits'] *= factor
+                entry['misses'] *= factor
+                entry['seconds'] *= factor
+                entry['updated'] = now
+        return cascades
+
+    def save(self):
+        """Add the attempts recorded since the last save to the stats file
+
+        The file is re-read under a lock, so counts other processes saved
+        meanwhile are kept, then replaced atomically.
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            try:
+                with locked_file(self.filename):
+                    cascades = self.load()
+                    for cascade, candidates in self.pending.items():
+                        for candidate, delta in candidates.items():
+                            entry = cascades.setdefault(cascade, {}).setdefault(
+                                candidate, {'hits': 0.0, 'misses': 0.0, 'seconds': 0.0})
+                            for field in ('hits', 'misses', 'seconds'):
+                                entry[field] += delta[field]
+                            entry['updated'] = time.time()
+                    with open(self.filename + '.part', 'w', encoding='utf-8') as f:
+                        json.dump(cascades, f, indent=2)
+                    os.replace(self.filename + '.part', self.filename)
+                self.cascades = cascades
+                self.pending = {}
+            except (OSError, TimeoutError) as e:
+                print(f"Could not save selector stats: {str(e)}")
+
+    def record(self, cascade, candidate, hit, seconds):
+        """Count one attempt of candidate and how long it took"""
+        with self.lock:
+            for counters in (self.cascades, self.pending):
+                entry = counters.setdefault(cascade, {}).setdefault(
+                    candidate, {'hits': 0.0, 'misses': 0.0, 'seconds': 0.0, 'updated': time.time()})
+                entry['hits' if hit else 'misses'] += 1
+                entry['seconds'] += seconds
+                entry['updated'] = time.time()
+
+    def expected_success(self, cascade, candidate):
+        """Smoothed hit rate - 0.5 for a candidate that has never been tried"""
+        entry = self.cascades.get(cascade, {}).get(candidate)
+        if not entry:
+            return 0.5
+        return (entry['hits'] + 1) / (entry['hits'] + entry['misses'] + 2)
+
+    def mean_latency(self, cascade, candidate):
+        """Average seconds per attempt, or 0 if never tried"""
+        entry = self.cascades.get(cascade, {}).get(candidate)
+        attempts = entry['hits'] + entry['misses'] if entry else 0
+        return entry['seconds'] / attempts if attempts else 0.0
+
+    def order(self, cascade, candidates):
+        """candidates sorted by expected success, then latency; ties keep their written order"""
+        return sorted(candidates, key=lambda candidate: (-self.expected_success(cascade, candidate),
+                                                         self.mean_latency(cascade, candidate)))
+
+    def dead_weight(self, min_attempts=20, max_hit_rate=0.02):
+        """[(cascade, candidate, attempts, hit rate)] for candidates that practically never match"""
+        dead = []
+        for cascade, candidates in self.cascades.items():
+            for candidate, entry in candidates.items():
+                attempts = entry['hits'] + entry['misses']
+                if attempts >= min_attempts and entry['hits'] / attempts <= max_hit_rate:
+                    dead.append((cascade, candidate, round(attempts), round(entry['hits'] / attempts, 3)))
+        return dead
+
+    def print_report(self):
+        """Print every cascade in learned order with its hit rate and latency, then the dead weight"""
+        for cascade, candidates in sorted(self.cascades.items()):
+            print(f"\n{cascade}:")
+            for candidate in self.order(cascade, candidates):
+                entry = candidates[candidate]
+                print(f"  {self.expected_success(cascade, candidate):5.1%}  "
+                      f"{self.mean_latency(cascade, candidate) * 1000:7.1f} ms  "
+                      f"{entry['hits'] + entry['misses']:7.1f} tries  {candidate}")
+
+        dead = self.dead_weight()
+        print(f"\nDead weight ({len(dead)} candidates):")
+        for cascade, candidate, attempts, hit_rate in dead:
+            print(f"  {cascade}: {candidate} ({attempts} tries, {hit_rate:.1%} hits)")
+
+# Process-wide stats, saved when the process exits
+_stats = None
+
+def get_selector_stats():
+    """The process-wide SelectorStats"""
+    global _stats
+    if _stats is None:
+        _stats = SelectorStats()
+        atexit.register(_stats.save)
+    return _stats
+
+def first_match(cascade, candidates, attempt, stats=None):
+    """Try candidates in learned order and return the first truthy attempt(candidate), or None
+
+    Every attempt is recorded; an exception counts as a miss.
+    """
+    stats = stats or get_selector_stats()
+    for candidate in stats.order(cascade, candidates):
+        started = time.perf_counter()
+        try:
+            result = attempt(candidate)
+        except Exception:
+            result = None
+        stats.record(cascade, candidate, bool(result), time.perf_counter() - started)
+        if result:
+            return result
+    return None
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'reset':
+        if os.path.exists(STATS_FILE):
+            os.remove(STATS_FILE)
+        print("Selector stats reset")
+    else:
+        get_selector_stats().print_report()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Amazon Session Store
+Saves the logged-in cookies and localStorage so later runs and workers can skip the login flow
+"""
+
+import json
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from page_waits import wait_for_page_ready
+from request_scheduler import scheduled_get
+from pageobjects.locators import LoginPage
+
+# Only these functions become keywords when imported as a Robot library
+__all__ = ['restore_saved_session', 'save_current_session', 'clear_saved_session']
+
+SESSION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazon_session.json')
+SITE_URL = "https://www.amazon.in/"
+
+# A tiny same-origin page: cookies and localStorage can be set on it without
+# loading the full home page twice
+COOKIE_LANDING_URL = "https://www.amazon.in/robots.txt"
+
+READ_LOCAL_STORAGE_JS = "return Object.assign({}, window.localStorage);"
+WRITE_LOCAL_STORAGE_JS = """
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+"""
+
+class SessionStore:
+    """Persists an authenticated Amazon session for our own account"""
+
+    def __init__(self, filename=SESSION_FILE, max_age_days=7):
+        self.filename = filename
+        self.max_age_days = max_age_days
+
+    def is_logged_in(self, driver, timeout=0):
+        """Check for the account greeting (txt_validate), waiting up to timeout seconds"""
+        try:
+            if not timeout:
+                return bool(driver.find_elements(By.XPATH, LoginPage.txt_validate))
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.XPATH, LoginPage.txt_validate))
+            )
+            return True
+        except Exception:
+            return False
+
+    def save(self, driver):
+        """Save cookies and localStorage of the current (logged-in) page"""
+        try:
+            session = {
+                'saved_at': time.time(),
+                'url': driver.current_url,
+                'cookies': driver.get_cookies(),
+                'local_storage': driver.execute_script(READ_LOCAL_STORAGE_JS)
+            }
+            temp_file = self.filename + '.part'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(session, f)
+            # The file holds live login cookies - keep it private to this user
+            os.chmod(temp_file, 0o600)
+            os.replace(temp_file, self.filename)
+            print(f"Saved session with {len(session['cookies'])} cookies to {self.filename}")
+            return True
+        except Exception as e:
+            print(f"Error saving session: {str(e)}")
+            return False
+
+    def load(self):
+        """Return the saved session, or None if there is none or it is too old"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading session file: {str(e)}")
+            return None
+
+        age_days = (time.time() - session.get('saved_at', 0)) / 86400
+        if age_days > self.max_age_days:
+            print(f"Saved session is {age_days:.1f} days old, ignoring it")
+            return None
+        return session
+
+    def restore(self, driver):
+        """Load the saved session into the browser and confirm it with one greeting probe"""
+        session = self.load()
+        if not session:
+            return False
+
+        try:
+            scheduled_get(driver, COOKIE_LANDING_URL)
+            for cookie in session['cookies']:
+                try:
+                    driver.add_cookie(cookie)
+                except Exception:
+                    # Cookies for other subdomains cannot be set from this page
+                    continue
+            if session.get('local_storage'):
+                driver.execute_script(WRITE_LOCAL_STORAGE_JS, session['local_storage'])
+
+            scheduled_get(driver, SITE_URL)
+            wait_for_page_ready(driver)
+            if self.is_logged_in(driver):
+                print("Restored saved session - skipping login")
+                return True
+
+            print("Saved session has expired, a full login is needed")
+            return False
+
+        except Exception as e:
+            print(f"Error restoring session: {str(e)}")
+            return False
+
+    def clear(self):
+        """Delete the saved session"""
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+def ensure_logged_in(driver, login, store=None):
+    """Restore the saved session, or call login() and save the session it creates"""
+    store = store or SessionStore()
+    if store.restore(driver):
+        return True
+
+    if not login():
+        return False
+    if store.is_logged_in(driver, timeout=10):
+        store.save(driver)
+    return True
+
+def _current_driver():
+    from robot.libraries.BuiltIn import BuiltIn
+    return BuiltIn().get_library_instance('SeleniumLibrary').driver
+
+def restore_saved_session():
+    """Robot keyword: restore the saved session in the current browser, returns True if logged in"""
+    return SessionStore().restore(_current_driver())
+
+def save_current_session():
+    """Robot keyword: save the session once the greeting shows the login succeeded"""
+    store = SessionStore()
+    driver = _current_driver()
+    if store.is_logged_in(driver, timeout=10):
+        return store.save(driver)
+    print("Login greeting not found, session not saved")
+    return False
+
+def clear_saved_session():
+    """Robot keyword: forget the saved session so the next run logs in again"""
+    SessionStore().clear()
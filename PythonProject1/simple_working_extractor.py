@@ -5,24 +5,36 @@ Focuses on the core issue: getting actual product data from Amazon's New Release
 """
 
 import json
-import csv
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from driver_resolver import create_chrome_service
 import re
+from bulk_extractor import extract_products_in_browser
+from dom_candidates import find_candidate_containers, scan_candidates
+from page_waits import wait_for_page_ready, PRODUCT_GRID_XPATH
+from selector_stats import first_match
+from session_store import ensure_logged_in
+from request_scheduler import scheduled_get, scheduled_click
+from page_health import probe_page_health, print_page_health
+from product_history import record_products
+from product_fields import extract_asin, get_product_link
+from stream_writer import ProductStreamWriter
+from excel_writer import write_products_excel
 
 class SimpleWorkingExtractor:
-    def __init__(self, headless=False):
-        """Initialize with basic setup"""
+    def __init__(self, headless=False, driver_pool=None):
+        """Initialize with basic setup (borrowed from driver_pool when given)"""
         self.driver = None
         self.headless = headless
-        self.setup_driver()
+        self.driver_pool = driver_pool
+        if driver_pool:
+            self.driver = driver_pool.acquire()
+        else:
+            self.setup_driver()
     
     def setup_driver(self):
         """Setup Chrome WebDriver with minimal options"""
@@ -35,7 +47,7 @@ class SimpleWorkingExtractor:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1920,1080")
         
-        service = Service(ChromeDriverManager().install())
+        service = create_chrome_service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.driver.maximize_window()
     
@@ -45,15 +57,14 @@ class SimpleWorkingExtractor:
             print("Starting login process...")
             
             # Navigate to Amazon
-            self.driver.get("https://www.amazon.in/")
-            time.sleep(5)
+            scheduled_get(self.driver, "https://www.amazon.in/")
+            wait_for_page_ready(self.driver)
             
             # Click on Sign In
             sign_in_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[text()='Hello, sign in']"))
             )
-            sign_in_element.click()
-            time.sleep(3)
+            scheduled_click(self.driver, sign_in_element)
             
             # Enter email
             email_field = WebDriverWait(self.driver, 10).until(
@@ -61,12 +72,10 @@ class SimpleWorkingExtractor:
             )
             email_field.clear()
             email_field.send_keys(email)
-            time.sleep(1)
             
             # Click Continue
             continue_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            continue_button.click()
-            time.sleep(3)
+            scheduled_click(self.driver, continue_button)
             
             # Enter password
             password_field = WebDriverWait(self.driver, 10).until(
@@ -74,12 +83,11 @@ class SimpleWorkingExtractor:
             )
             password_field.clear()
             password_field.send_keys(password)
-            time.sleep(1)
             
             # Click Sign In
             sign_in_button = self.driver.find_element(By.XPATH, "//input[@type='submit']")
-            sign_in_button.click()
-            time.sleep(5)
+            scheduled_click(self.driver, sign_in_button)
+            wait_for_page_ready(self.driver)
             
             print("Login successful!")
             return True
@@ -94,8 +102,8 @@ class SimpleWorkingExtractor:
             print("Navigating to New Releases...")
             
             # Try direct navigation first
-            self.driver.get("https://www.amazon.in/gp/new-releases/")
-            time.sleep(10)
+            scheduled_get(self.driver, "https://www.amazon.in/gp/new-releases/")
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Check if we're on the right page
             current_url = self.driver.current_url
@@ -108,29 +116,27 @@ class SimpleWorkingExtractor:
                 print("Direct navigation failed, trying menu navigation...")
                 
                 # Try menu navigation
-                self.driver.get("https://www.amazon.in/")
-                time.sleep(3)
+                scheduled_get(self.driver, "https://www.amazon.in/")
+                wait_for_page_ready(self.driver)
                 
                 # Click on category menu
                 category_menu = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//span[@class='hm-icon-label'][1]"))
                 )
                 category_menu.click()
-                time.sleep(3)
                 
                 # Click on "All" category
                 all_category = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//a[@class='hmenu-item' and contains(text(), 'All')]"))
                 )
                 all_category.click()
-                time.sleep(2)
                 
                 # Click on "New Releases"
                 new_releases = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//a[@href='/gp/new-releases/?ref_=nav_em_cs_newreleases_0_1_1_3']"))
                 )
-                new_releases.click()
-                time.sleep(5)
+                scheduled_click(self.driver, new_releases)
+                wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
                 
                 print("Successfully navigated via menu!")
                 return True
@@ -144,25 +150,19 @@ class SimpleWorkingExtractor:
         try:
             print("\n=== PAGE DEBUG ===")
             
-            # Get page title
-            page_title = self.driver.title
-            print(f"Page title: {page_title}")
-            
-            # Get current URL
-            current_url = self.driver.current_url
-            print(f"Current URL: {current_url}")
-            
-            # Get page source length
-            page_source = self.driver.page_source
-            print(f"Page source length: {len(page_source)}")
+            # Get page title, URL and size in one call
+            health = probe_page_health(self.driver)
+            print(f"Page title: {health['title']}")
+            print(f"Current URL: {health['url']}")
+            print_page_health(health)
             
             # Check for specific text
-            if "Hot New Releases" in page_source:
+            if health['markers']['Hot New Releases']:
                 print("✓ Found 'Hot New Releases' text in page source")
             else:
                 print("✗ 'Hot New Releases' text NOT found in page source")
             
-            if "New Releases" in page_source:
+            if health['markers']['New Releases']:
                 print("✓ Found 'New Releases' text in page source")
             else:
                 print("✗ 'New Releases' text NOT found in page source")
@@ -171,14 +171,12 @@ class SimpleWorkingExtractor:
             product_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/dp/')]")
             print(f"Found {len(product_links)} product links")
             
-            # Look for any divs with product-like content
-            all_divs = self.driver.find_elements(By.XPATH, "//div")
-            product_divs = []
-            for div in all_divs:
-                text = div.text.lower()
-                if any(keyword in text for keyword in ['₹', '$', 'price', 'rating', 'stars']):
-                    product_divs.append(div)
-            print(f"Found {len(product_divs)} divs with product-like content")
+            # Score divs for product-like content inside the browser
+            scan = scan_candidates(self.driver, top_n=5)
+            if scan:
+                print(f"Found {scan['total']} divs with product-like content")
+                for candidate in scan['candidates']:
+                    print(f"  score {candidate['score']}: {candidate['text'][:80]}")
             
             # Take screenshot
             self.driver.save_screenshot("debug_page_content.png")
@@ -217,19 +215,30 @@ class SimpleWorkingExtractor:
             print(f"Error getting category name: {str(e)}")
             return "Hot New Releases - Unknown Category"
     
-    def extract_products(self, max_products=5):
+    def extract_products(self, max_products=5, bulk=True, on_product=None):
         """Extract product information"""
         products = []
         
         try:
             print("Looking for product elements...")
             
-            # Wait for page to load
-            time.sleep(5)
+            # Wait for the product grid to render
+            wait_for_page_ready(self.driver, PRODUCT_GRID_XPATH)
             
             # Scroll to load content
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(3)
+            wait_for_page_ready(self.driver)
+            
+            # Bulk mode: every product record in a single execute_script round trip
+            if bulk:
+                products = extract_products_in_browser(self.driver, max_products)
+                if products:
+                    if on_product:
+                        for product in products:
+                            on_product(product)
+                    print(f"\nSuccessfully extracted {len(products)} products")
+                    return products
+                print("Bulk extraction found no products, falling back to element-by-element extraction...")
             
             # Try to find product containers
             product_containers = []
@@ -254,24 +263,19 @@ class SimpleWorkingExtractor:
                 except:
                     print("Error finding product links")
             
-            # Strategy 3: Look for any elements with product-like content
+            # Strategy 3: Best-scoring product-like elements, scored inside the browser
             if not product_containers:
-                try:
-                    all_divs = self.driver.find_elements(By.XPATH, "//div")
-                    potential_products = []
-                    for div in all_divs:
-                        text = div.text.lower()
-                        if any(keyword in text for keyword in ['₹', '$', 'price', 'rating', 'stars']):
-                            potential_products.append(div)
-                    product_containers = potential_products
-                    print(f"Found {len(potential_products)} potential product divs")
-                except:
-                    print("Error finding potential product divs")
+                candidates = find_candidate_containers(self.driver, top_n=max_products * 2)
+                product_containers = [candidate['element'] for candidate in candidates]
+                print(f"Found {len(product_containers)} potential product divs")
             
             print(f"Total containers to process: {len(product_containers)}")
             
             # Extract products
-            for i, container in enumerate(product_containers[:max_products]):
+            seen_asins = set()
+            for i, container in enumerate(product_containers):
+                if len(products) >= max_products:
+                    break
                 try:
                     print(f"\n--- Processing Product {i+1} ---")
                     
@@ -288,17 +292,27 @@ class SimpleWorkingExtractor:
                     # Extract rating
                     rating = self.get_product_rating(container)
                     
+                    # Extract the ASIN from the product's /dp/ link
+                    link = get_product_link(container)
+                    
                     product_data = {
                         'ranking': len(products) + 1,
+                        'asin': extract_asin(link),
                         'title': title,
                         'price': price,
                         'rating': rating,
+                        'link': link,
                         'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
                     
                     # Only add if we got meaningful data
-                    if title != "No Title Available" or price != "Price Not Available":
+                    if product_data['asin'] and product_data['asin'] in seen_asins:
+                        print(f"Skipping product {i+1} - duplicate of {product_data['asin']}")
+                    elif title != "No Title Available" or price != "Price Not Available":
+                        seen_asins.add(product_data['asin'])
                         products.append(product_data)
+                        if on_product:
+                            on_product(product_data)
                         print(f"Added product {len(products)}: {title[:50]}...")
                     else:
                         print(f"Skipping product {i+1} - no meaningful data")
@@ -325,14 +339,15 @@ class SimpleWorkingExtractor:
             ".//a[contains(@class, 'a-link')]//span"
         ]
         
-        for selector in title_selectors:
-            try:
-                title_element = container.find_element(By.XPATH, selector)
-                title = title_element.text.strip()
+        def title_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                title = element.text.strip()
                 if title and len(title) > 5:
                     return title
-            except:
-                continue
+        
+        title = first_match('product_title', title_selectors, title_from)
+        if title:
+            return title
         
         # Fallback: get any meaningful text from the container
         try:
@@ -356,14 +371,15 @@ class SimpleWorkingExtractor:
             ".//span[contains(text(), '$')]"
         ]
         
-        for selector in price_selectors:
-            try:
-                price_element = container.find_element(By.XPATH, selector)
-                price = price_element.text.strip()
+        def price_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                price = element.text.strip()
                 if price and ('₹' in price or '$' in price):
                     return price
-            except:
-                continue
+        
+        price = first_match('product_price', price_selectors, price_from)
+        if price:
+            return price
         
         return "Price Not Available"
     
@@ -377,14 +393,15 @@ class SimpleWorkingExtractor:
             ".//span[contains(text(), 'stars')]"
         ]
         
-        for selector in rating_selectors:
-            try:
-                rating_element = container.find_element(By.XPATH, selector)
-                rating = rating_element.text.strip()
+        def rating_from(selector):
+            for element in container.find_elements(By.XPATH, selector)[:1]:
+                rating = element.text.strip()
                 if rating and ('out of' in rating or 'stars' in rating):
                     return rating
-            except:
-                continue
+        
+        rating = first_match('product_rating', rating_selectors, rating_from)
+        if rating:
+            return rating
         
         return "No Rating Available"
     
@@ -411,29 +428,6 @@ class SimpleWorkingExtractor:
             print(f"Error saving to JSON: {str(e)}")
             return None
     
-    def save_to_csv(self, products, category_name):
-        """Save products to CSV file (Excel compatible)"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"hot_new_releases_{self.sanitize_filename(category_name)}_{timestamp}.csv"
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['ranking', 'title', 'price', 'rating', 'category', 'extracted_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for product in products:
-                    product['category'] = category_name
-                    product['extracted_at'] = timestamp
-                    writer.writerow(product)
-            
-            print(f"Products saved to CSV file: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error saving to CSV: {str(e)}")
-            return None
-    
     def sanitize_filename(self, filename):
         """Sanitize filename by removing/replacing invalid characters"""
         return re.sub(r'[<>:"/\\|?*]', '_', filename).replace(' ', '_')
@@ -444,7 +438,7 @@ class SimpleWorkingExtractor:
             print("Starting Simple Working extraction...")
             
             # Login to Amazon
-            if not self.login_to_amazon(email, password):
+            if not ensure_logged_in(self.driver, lambda: self.login_to_amazon(email, password)):
                 print("Login failed!")
                 return False
             
@@ -459,8 +453,9 @@ class SimpleWorkingExtractor:
             # Get category name
             category_name = self.get_category_name()
             
-            # Extract products
-            products = self.extract_products()
+            # Extract products, streaming each one to disk as it is found
+            with ProductStreamWriter(category_name) as stream:
+                products = self.extract_products(on_product=stream.write)
             
             if not products:
                 print("No products extracted!")
@@ -469,8 +464,14 @@ class SimpleWorkingExtractor:
             # Save to JSON
             json_file = self.save_to_json(products, category_name)
             
-            # Save to CSV (Excel compatible)
-            csv_file = self.save_to_csv(products, category_name)
+            # The CSV was written row by row during extraction
+            csv_file = stream.csv_filename
+            
+            # Save a native Excel workbook with numeric price and rating cells
+            excel_file = write_products_excel(stream.basename + '.xlsx', products, category_name)
+            
+            # Append this run to the product history database
+            record_products(products, category_name)
             
             # Display results
             print("\n" + "="*50)
@@ -480,6 +481,8 @@ class SimpleWorkingExtractor:
             print(f"Products extracted: {len(products)}")
             print(f"JSON file: {json_file}")
             print(f"CSV file: {csv_file}")
+            print(f"JSON Lines file: {stream.jsonl_filename}")
+            print(f"Excel file: {excel_file}")
             print("\nExtracted Products:")
             for product in products:
                 print(f"  {product['ranking']}. {product['title'][:60]}...")
@@ -492,8 +495,10 @@ class SimpleWorkingExtractor:
             return False
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser, or hand it back to the driver pool"""
+        if self.driver and self.driver_pool:
+            self.driver_pool.release(self.driver)
+        elif self.driver:
             self.driver.quit()
 
 def main():
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Navigation Strategy Racer
+Runs independent navigation strategies at the same time in separate tabs or worker threads and keeps the first that passes the content check
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+from page_health import probe_page_health, has_marker
+from request_scheduler import get_scheduler
+from selector_stats import get_selector_stats
+
+SITE_URL = "https://www.amazon.in/"
+
+MENU_XPATH = "//span[@class='hm-icon-label'][1]"
+
+NEW_RELEASES_LINK_XPATHS = [
+    "//a[@href='/gp/new-releases/?ref_=nav_em_cs_newreleases_0_1_1_3']",
+    "//a[contains(@href, 'new-releases')]",
+    "//a[contains(text(), 'New Releases')]"
+]
+
+def has_new_releases_content(health):
+    """Default content check - a rendered page that mentions (Hot) New Releases"""
+    return health['html_length'] > 5000 and has_marker(health)
+
+def navigation_slot(url):
+    """Reserve a scheduler slot for url and yield until it comes up, so other tabs keep running meanwhile"""
+    ready_at = time.perf_counter() + get_scheduler().reserve(url)
+    while time.perf_counter() < ready_at:
+        yield
+
+def begin_navigation(driver, url):
+    """Point the current tab at url without blocking on the page load"""
+    driver.execute_script("window.location.href = arguments[0];", url)
+
+def load_url_steps(url):
+    """Steps that load url once the scheduler allows it"""
+    def steps(driver):
+        yield from navigation_slot(url)
+        begin_navigation(driver, url)
+    return steps
+
+def find_new_releases_href(driver):
+    """href of the first New Releases link on the current page, or None"""
+    for xpath in NEW_RELEASES_LINK_XPATHS:
+        for link in driver.find_elements(By.XPATH, xpath):
+            href = link.get_attribute('href')
+            if href:
+                return href
+    return None
+
+def menu_navigation_steps(driver):
+    """Hamburger-menu route to New Releases, as steps for NavigationRace.add_steps"""
+    yield from navigation_slot(SITE_URL)
+    begin_navigation(driver, SITE_URL)
+    while not driver.find_elements(By.XPATH, MENU_XPATH):
+        yield
+    driver.find_element(By.XPATH, MENU_XPATH).click()
+    href = find_new_releases_href(driver)
+    while href is None:
+        yield
+        href = find_new_releases_href(driver)
+    yield from navigation_slot(href)
+    begin_navigation(driver, href)
+
+class NavigationRace:
+    """First-past-the-post runner for navigation strategies
+
+    URL and step strategies each get their own browser tab. Step strategies
+    are generators that do a little work and yield while they wait for the
+    page or a scheduler slot, so one WebDriver session can drive every tab
+    in turn while the browser loads them all at once. Worker strategies are
+    plain callables run in threads - they must not touch the driver. The
+    first tab whose page passes accept(health), or the first worker
+    returning a truthy value, wins; the other tabs are closed and pending
+    workers cancelled. Wins and failures are recorded in selector_stats
+    under cascade, and strategies that won before start first.
+    """
+
+    def __init__(self, driver, accept=has_new_releases_content, timeout=30, settle=3, poll_interval=0.25,
+                 cascade='navigation'):
+        """settle is how long a loaded page may keep failing the check before its strategy is given up"""
+        self.driver = driver
+        self.cascade = cascade
+        self.accept = accept
+        self.timeout = timeout
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.tab_strategies = []
+        self.workers = []
+        self.winner = None
+        self.result = None
+        self.timings = {}
+
+    def add_url(self, name, url):
+        """Strategy that loads url in its own tab"""
+        return self.add_steps(name, load_url_steps(url))
+
+    def add_steps(self, name, steps):
+        """Strategy that runs the generator function steps(driver) in its own tab"""
+        self.tab_strategies.append((name, steps))
+        return self
+
+    def add_worker(self, name, func):
+        """Strategy that runs func() in a worker thread; a truthy return value wins and becomes self.result"""
+        self.workers.append((name, func))
+        return self
+
+    def open_tabs(self, started):
+        """Open one blank tab per tab strategy, best track record first - their steps start on the first poll"""
+        strategies = dict(self.tab_strategies)
+        if self.cascade:
+            order = get_selector_stats().order(self.cascade, list(strategies))
+        else:
+            order = list(strategies)
+        tabs = []
+        for name in order:
+            steps = strategies[name]
+            try:
+                self.driver.switch_to.new_window('tab')
+            except Exception as e:
+                self.finish(name, started, f"could not open a tab: {str(e)}")
+                continue
+            tabs.append({'name': name, 'handle': self.driver.current_window_handle, 'steps': steps(self.driver),
+                         'left_url': 'about:blank', 'settled_at': None})
+        return tabs
+
+    def finish(self, name, started, outcome, won=False):
+        """Record how long a strategy ran and whether it won, and print its outcome"""
+        elapsed = time.perf_counter() - started
+        self.timings[name] = round(elapsed, 2)
+        if self.cascade:
+            get_selector_stats().record(self.cascade, name, won, elapsed)
+        print(f"[race] {name}: {outcome} after {self.timings[name]}s")
+
+    def poll_tab(self, tab, started):
+        """Advance or check one tab - returns True if it won, False if it failed, None while still running"""
+        self.driver.switch_to.window(tab['handle'])
+        if tab['steps'] is not None:
+            tab['left_url'] = self.driver.current_url
+            try:
+                next(tab['steps'])
+                return None
+            except StopIteration:
+                tab['steps'] = None
+            except Exception as e:
+                self.finish(tab['name'], started, f"failed: {str(e)}")
+                return False
+
+        health = probe_page_health(self.driver)
+        if self.accept(health):
+            return True
+        # Only a page that has left the starting URL and finished loading can fail
+        if health['ready_state'] == 'complete' and health['url'] not in ('', tab['left_url']):
+            now = time.perf_counter()
+            tab['settled_at'] = tab['settled_at'] or now
+            if now - tab['settled_at'] > self.settle:
+                self.finish(tab['name'], started, f"content check failed ({health['html_length']} bytes)")
+                return False
+        return None
+
+    def run(self):
+        """Race every strategy - returns the winning strategy name, or None if they all failed or timed out"""
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        original = self.driver.current_window_handle
+        executor = ThreadPoolExecutor(max_workers=len(self.workers)) if self.workers else None
+        futures = {executor.submit(func): name for name, func in self.workers} if executor else {}
+        winning_tab = None
+
+        try:
+            pending = self.open_tabs(started)
+            while (pending or futures) and time.perf_counter() < deadline:
+                for tab in list(pending):
+                    outcome = self.poll_tab(tab, started)
+                    if outcome is None:
+                        continue
+                    pending.remove(tab)
+                    if outcome:
+                        winning_tab = tab
+                        self.winner, self.result = tab['name'], True
+                        break
+                if self.winner:
+                    break
+
+                for future in [future for future in futures if future.done()]:
+                    name = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.finish(name, started, f"failed: {str(e)}")
+                        continue
+                    if result:
+                        self.winner, self.result = name, result
+                        break
+                    self.finish(name, started, "no result")
+                if self.winner:
+                    break
+                time.sleep(self.poll_interval)
+
+            if self.winner:
+                self.finish(self.winner, started, "won", won=True)
+                for name in [tab['name'] for tab in pending] + list(futures.values()):
+                    print(f"[race] {name}: cancelled")
+            else:
+                print(f"[race] No strategy succeeded after {time.perf_counter() - started:.2f}s")
+        finally:
+            # Running HTTP requests cannot be interrupted; their results are ignored
+            for future in futures:
+                future.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+            self.close_other_tabs(winning_tab['handle'] if winning_tab else original)
+
+        return self.winner
+
+    def close_other_tabs(self, keep):
+        """Close every window except keep and switch to it"""
+        for handle in self.driver.window_handles:
+            if handle != keep:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+        self.driver.switch_to.window(keep)
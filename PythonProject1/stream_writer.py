@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Streaming Product Writer
+Appends each product to JSON Lines (and CSV) the moment it is extracted and publishes the files atomically at the end of the run
+"""
+
+import csv
+import json
+import os
+import re
+from datetime import datetime
+
+CSV_FIELDS = ['ranking', 'asin', 'title', 'price', 'rating', 'category', 'extracted_at']
+
+def output_basename(category_name, timestamp=None):
+    """hot_new_releases_<category>_<timestamp>, with characters that are invalid in file names replaced"""
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    safe_category = re.sub(r'[<>:"/\\|?*]', '_', category_name).replace(' ', '_')
+    return f"hot_new_releases_{safe_category}_{timestamp}"
+
+def read_jsonl(filename):
+    """Products of a .jsonl (or leftover .jsonl.part) file - a line cut off by a crash is skipped"""
+    products = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                products.append(json.loads(line))
+            except ValueError:
+                continue
+    return products
+
+class ProductStreamWriter:
+    """Writes products one at a time to <basename>.jsonl and optionally <basename>.csv
+
+    Rows go to .part files that are flushed to disk every flush_every
+    products, so at most one batch is lost if the process dies. finalize()
+    renames them to their final names in one step each. The writer keeps
+    no products in memory. As a context manager it finalizes on success
+    and keeps the flushed .part files when the block raises.
+    """
+
+    def __init__(self, category_name, basename=None, write_csv=True, flush_every=10):
+        basename = basename or output_basename(category_name)
+        self.category_name = category_name
+        self.basename = basename
+        self.jsonl_filename = basename + '.jsonl'
+        self.csv_filename = basename + '.csv' if write_csv else None
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.pending = 0
+        self.files = []
+
+        self.jsonl = self.open_part(self.jsonl_filename)
+        self.csv_writer = None
+        if self.csv_filename:
+            self.csv_writer = csv.DictWriter(self.open_part(self.csv_filename, newline=''), fieldnames=CSV_FIELDS,
+                                             extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    def open_part(self, filename, newline=None):
+        """Open filename's .part file for writing and track it for flush/finalize"""
+        f = open(filename + '.part', 'w', encoding='utf-8', newline=newline)
+        self.files.append((filename, f))
+        return f
+
+    def write(self, product):
+        """Append one product - usable directly as an extract_products on_product callback"""
+        record = dict(product, category=product.get('category') or self.category_name)
+        self.jsonl.write(json.dumps(record, ensure_ascii=False) + '\n')
+        if self.csv_writer:
+            self.csv_writer.writerow(record)
+        self.count += 1
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Push the rows written so far to disk"""
+        for _, f in self.files:
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending = 0
+
+    def close(self):
+        """Flush and close the .part files"""
+        self.flush()
+        for _, f in self.files:
+            f.close()
+
+    def finalize(self):
+        """Close the files and move them to their final names - returns True if any product was written
+
+        A run that produced nothing leaves no files behind.
+        """
+        self.close()
+        for filename, _ in self.files:
+            if self.count:
+                os.replace(filename + '.part', filename)
+            else:
+                os.remove(filename + '.part')
+        if self.count:
+            print(f"Streamed {self.count} products to {', '.join(filename for filename, _ in self.files)}")
+        return bool(self.count)
+
+    def abort(self):
+        """Close the files but keep the partial .part output for inspection or recovery"""
+        self.close()
+        print(f"Run failed after {self.count} products - partial output kept in "
+              f"{', '.join(filename + '.part' for filename, _ in self.files)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+        return False